@@ -1,8 +1,26 @@
 import pandas as pd
 import numpy as np
+import gc
 import os
+import sys
 import warnings
 
+# Reuse the ETL validation rules (ETL_Process holds plain scripts, not a package)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ETL_Process'))
+from validation import SCHEMAS, validate, display_validation_report
+from profiler import profile_dataset, display_column_profiles
+from triage import DEFAULT_HEAD_ROWS, DEFAULT_MEMORY_BUDGET, triage_file, schedule, display_triage
+from memoize import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, SectionCache, fingerprint_file, fingerprint_code
+
+# Default directory scanned for datasets (relative to the repository root)
+DEFAULT_DATA_PATH = "Datasource/"
+
+# Supported file extensions
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+# Dictionary to store all datasets loaded by load_and_inspect_dataset
+datasets = {}
+
 def calculate_data_quality_metrics(df, dataset_name):
     """Calculate comprehensive data quality metrics for a dataset"""
     
@@ -70,8 +88,21 @@ def display_quality_metrics(quality_metrics):
     
     print(f"Quality Level: {quality_level}")
 
+def display_schema_validation(dataset_name, df):
+    """Run the declarative validation rules registered for a dataset, if any"""
+    rules = SCHEMAS.get(dataset_name.lower())
+    if rules is None:
+        return None
+    try:
+        report = validate(df, rules)
+    except KeyError as e:
+        print(f"  ⚠️  Schema validation skipped: {e}")
+        return None
+    display_validation_report(report)
+    return report
+
 # Function to safely load and inspect datasets
-def load_and_inspect_dataset(filename, dataset_name):
+def load_and_inspect_dataset(filename, dataset_name, data_path=DEFAULT_DATA_PATH, datasets=datasets):
     """Load dataset and return basic information"""
     try:
         file_path = os.path.join(data_path, filename)
@@ -149,6 +180,8 @@ def display_dataset_info(filename, dataset_name, df=None, excel_data=None):
         # Calculate and display quality metrics for CSV
         quality_metrics = calculate_data_quality_metrics(df, dataset_name)
         display_quality_metrics(quality_metrics)
+        display_column_profiles(profile_dataset(df, n_jobs=-1))
+        display_schema_validation(dataset_name, df)
     
     # Handle Excel files with all sheets
     elif excel_data is not None:
@@ -190,6 +223,8 @@ def display_dataset_info(filename, dataset_name, df=None, excel_data=None):
             # Calculate and display quality metrics for each sheet
             sheet_quality_metrics = calculate_data_quality_metrics(sheet_df, f"{dataset_name}_{sheet_name}")
             display_quality_metrics(sheet_quality_metrics)
+            display_column_profiles(profile_dataset(sheet_df, n_jobs=-1))
+            display_schema_validation(dataset_name, sheet_df)
         
         # Calculate overall quality metrics for the entire Excel file (all sheets combined)
         print(f"\n{'='*50}")
@@ -203,33 +238,111 @@ def display_dataset_info(filename, dataset_name, df=None, excel_data=None):
         print(f"📊 Combined Analysis Across All {total_sheets} Sheets:")
         display_quality_metrics(overall_quality_metrics)
 
-    
-# Define data path
-data_path = "Datasource/"
 
-# Dictionary to store all datasets
-datasets = {}
+def read_file_datasets(filename, dataset_name, data_path=DEFAULT_DATA_PATH):
+    """Read a CSV or every sheet of an Excel file into {dataset key: DataFrame}, without reporting"""
+    file_path = os.path.join(data_path, filename)
+    if filename.endswith('.csv'):
+        return {dataset_name: pd.read_csv(file_path)}
+    sheets = pd.read_excel(file_path, sheet_name=None)
+    if len(sheets) == 1:
+        return {dataset_name: next(iter(sheets.values()))}
+    return {f"{dataset_name}_{sheet_name}": sheet_df for sheet_name, sheet_df in sheets.items()}
 
-# count of successfully loaded datasets
-count = 0
 
-# Load all datasets from the specified directory
-for filename in os.listdir(data_path):
-    # Skip temporary files and hidden files
-    if filename.startswith('.') or filename.startswith('~$'):
-        continue
-        
-    # Only process supported file types
-    if not (filename.endswith('.csv') or filename.endswith('.xlsx') or filename.endswith('.xls')):
-        continue
-        
-    dataset_name = os.path.splitext(filename)[0]
-    result, message = load_and_inspect_dataset(filename, dataset_name)
-    if result is None:
-        print(f"❌ {message}")
-    else:
-        count += 1
-print(f"\n Successfully loaded {count} datasets from the directory '{data_path}'.")
+def open_report_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """Report cache whose keys also cover the source of this script and the validation rules"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    sources = [os.path.abspath(__file__), os.path.join(here, 'profiler.py'),
+               os.path.join(here, '..', 'ETL_Process', 'validation.py'), os.path.join(here, '..', 'ETL_Process', 'sketches.py')]
+    return SectionCache(os.path.join(cache_dir, 'evaluation'), max_bytes, code_version=fingerprint_code(*sources))
 
 
-    
+def list_candidate_files(data_path=DEFAULT_DATA_PATH):
+    """Supported files in a directory, skipping temporary and hidden files"""
+    return [
+        filename for filename in sorted(os.listdir(data_path))
+        if not (filename.startswith('.') or filename.startswith('~$')) and filename.endswith(SUPPORTED_EXTENSIONS)
+    ]
+
+
+def evaluate_directory(data_path=DEFAULT_DATA_PATH, cache=None, memory_budget=DEFAULT_MEMORY_BUDGET,
+                       head_rows=DEFAULT_HEAD_ROWS, triage_only=False, keep_frames=True):
+    """Triage, then load and inspect the datasets in a directory (returns the datasets dict)
+
+    Every file is first triaged from its metadata and first head_rows rows;
+    files that pass are fully analysed smallest first, in rounds whose
+    estimated memory fits memory_budget, releasing each round's datasets
+    before the next. With a SectionCache, each file's
+    printed report and load status are keyed on the file's content hash, so
+    unchanged files are replayed instead of re-analysed; the DataFrames are
+    never cached and are re-read on a cache hit only when keep_frames is set.
+    keep_frames returns the datasets of the first round (the ones that fit
+    the budget together); without it the returned dict stays empty.
+    """
+    # Dictionary to store all datasets
+    loaded = {}
+
+    # count of successfully loaded datasets
+    count = 0
+
+    triaged = [triage_file(os.path.join(data_path, filename), head_rows) for filename in list_candidate_files(data_path)]
+    rounds = schedule(triaged, memory_budget)
+    display_triage(triaged)
+    if triage_only:
+        return loaded
+
+    # Fully load the scheduled datasets round by round, smallest first
+    for number, scheduled in enumerate(rounds, 1):
+        if number > 1:
+            gc.collect()  # the previous round's datasets are no longer referenced
+            print(f"\n🔁 Round {number}/{len(rounds)}: analysing {len(scheduled)} deferred file(s)")
+        for triage_result in scheduled:
+            filename = triage_result['file']
+            dataset_name = os.path.splitext(filename)[0]
+            keep = keep_frames and number == 1
+            file_datasets = {}
+            if cache is None:
+                result, message = load_and_inspect_dataset(filename, dataset_name, data_path, file_datasets)
+            else:
+                result, message = cache.run(
+                    'load_and_inspect_dataset', load_and_inspect_dataset, (filename, dataset_name, data_path, file_datasets),
+                    data_fingerprint=fingerprint_file(os.path.join(data_path, filename)),
+                    params={'dataset_name': dataset_name})
+                if keep and result is not None and not file_datasets:
+                    file_datasets = read_file_datasets(filename, dataset_name, data_path)  # replayed from the cache
+            if keep:
+                loaded.update(file_datasets)
+            if result is None:
+                print(f"❌ {message}")
+            else:
+                count += 1
+    print(f"\n Successfully loaded {count} datasets from the directory '{data_path}'.")
+    skipped = len(triaged) - sum(len(scheduled) for scheduled in rounds)
+    if skipped:
+        print(f" Skipped {skipped} file(s) that failed triage.")
+    if keep_frames and len(rounds) > 1:
+        print(f" Datasets of {sum(len(scheduled) for scheduled in rounds[1:])} deferred file(s) were analysed but not kept in memory.")
+    return loaded
+
+
+def main(data_path=DEFAULT_DATA_PATH, cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES,
+         memory_budget=DEFAULT_MEMORY_BUDGET, head_rows=DEFAULT_HEAD_ROWS, triage_only=False, keep_frames=True):
+    """Evaluate every dataset in data_path (returns a process exit code)
+
+    With cache_dir, per-file reports are memoized there; triage_only stops
+    after the triage table, and keep_frames=False only reports without
+    keeping the loaded datasets (see evaluate_directory).
+    """
+    if not os.path.isdir(data_path):
+        print(f"❌ Data directory not found: {data_path}")
+        return 1
+    cache = open_report_cache(cache_dir, cache_max_bytes) if cache_dir else None
+    datasets.update(evaluate_directory(data_path, cache, memory_budget, head_rows, triage_only, keep_frames))
+    if cache is not None:
+        print(cache.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
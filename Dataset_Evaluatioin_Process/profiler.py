@@ -0,0 +1,297 @@
+# Streaming per-column profiler for the datasets in Datasource/
+#
+# Each column is summarised in one pass over chunks of rows with fixed-size,
+# mergeable sketches, so memory per column does not grow with the data:
+#   - null rate and row counts (exact)
+#   - distinct count estimate (HyperLogLog, 2**12 registers, ~1.6% error)
+#   - top-k frequent values (space-saving counters with error bounds)
+#   - min/max and a quantile sketch (compacting buffers, KLL style)
+#   - a fixed-bin histogram whose bin width doubles when values fall outside it
+# Numeric and datetime columns get all sketches, other columns the first three.
+# Columns are independent, so chunks are profiled column by column on a thread
+# pool, and sketches built on separate chunks can be merged.
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+# The quantile sketch is shared with the ETL's outlier engine; ETL_Process is made importable by
+# pipeline.import_stage (or Dataset_Evaluation_Process.py when run directly)
+from sketches import QuantileSketch
+
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_TOP_K = 5
+HLL_PRECISION = 12
+HISTOGRAM_BINS = 20
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+class DistinctSketch:
+    """HyperLogLog estimate of the number of distinct values"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def update(self, hashes):
+        if not len(hashes):
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = (hashes << np.uint64(self.precision)) | np.uint64(1 << (self.precision - 1))
+        # Rank = position of the leftmost 1-bit (1-based), from the exact bit length of each half
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        bit_length = np.where(high > 0, 33 + np.floor(np.log2(np.maximum(high, 1))),
+                              1 + np.floor(np.log2(np.maximum(low, 1))))
+        rank = (65 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        empty = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and empty:
+            return int(round(m * np.log(m / empty)))  # linear counting for small cardinalities
+        return int(round(raw))
+
+
+class TopKSketch:
+    """Space-saving heavy hitters: at most capacity counters, each with an overcount bound"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}  # value -> (count, error)
+        self.floor = 0  # no unmonitored value occurs more often than this
+
+    def update(self, counts):
+        """Add exact counts (a value_counts Series) from one chunk"""
+        counts = counts.nlargest(self.capacity + 1)
+        chunk = TopKSketch(self.capacity)
+        kept = counts.iloc[:self.capacity]
+        chunk.counts = {value: (int(count), 0) for value, count in kept.items()}
+        chunk.floor = int(counts.iloc[self.capacity]) if len(counts) > self.capacity else 0
+        self.merge(chunk)
+
+    def merge(self, other):
+        combined = {}
+        for value in self.counts.keys() | other.counts.keys():
+            count_a, error_a = self.counts.get(value, (self.floor, self.floor))
+            count_b, error_b = other.counts.get(value, (other.floor, other.floor))
+            combined[value] = (count_a + count_b, error_a + error_b)
+        ranked = sorted(combined.items(), key=lambda item: -item[1][0])
+        dropped = ranked[self.capacity:]
+        self.counts = dict(ranked[:self.capacity])
+        self.floor = max([self.floor + other.floor] + [count for _, (count, _) in dropped])
+
+    def top(self, k):
+        """[(value, estimated count, guaranteed minimum count)] for the k most frequent values"""
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1][0])[:k]
+        return [(value, count, count - error) for value, (count, error) in ranked]
+
+
+class Histogram:
+    """Fixed number of equal-width bins on a grid anchored at the first values seen
+
+    The first chunk's range plus a margin sets the bin width. When later values
+    fall outside the bins, the window of bins slides along the grid, and if the
+    old and new values do not fit in it the width doubles first (merging
+    aligned pairs of bins), so counts are never re-estimated.
+    """
+
+    def __init__(self, bins=HISTOGRAM_BINS, margin=0.25):
+        self.bins = bins
+        self.margin = margin
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.origin = None
+        self.width = None
+        self.start = 0  # grid index of the first bin; bin i covers origin + [i, i + 1) * width
+
+    def _grid(self, values):
+        return np.floor((values - self.origin) / self.width).astype(np.int64)
+
+    def update(self, values):
+        if not len(values):
+            return
+        low, high = values.min(), values.max()
+        if self.width is None:
+            span = high - low if high > low else 1.0
+            self.origin = low - self.margin * span
+            self.width = span * (1 + 2 * self.margin) / self.bins
+        while True:
+            occupied = self.start + np.flatnonzero(self.counts)
+            first = min([self._grid(low)] + list(occupied[:1]))
+            last = max([self._grid(high)] + list(occupied[-1:]))
+            if last - first < self.bins:
+                break
+            self._double()
+        if first < self.start or last >= self.start + self.bins:
+            self._move(first if first < self.start else last - self.bins + 1)
+        index = self._grid(values) - self.start
+        self.counts += np.bincount(np.clip(index, 0, self.bins - 1), minlength=self.bins)
+
+    def _double(self):
+        grid = self.start + np.arange(self.bins)
+        new_start = self.start // 2
+        merged = np.zeros(self.bins, dtype=np.int64)
+        np.add.at(merged, grid // 2 - new_start, self.counts)
+        self.counts, self.start, self.width = merged, new_start, self.width * 2
+
+    def _move(self, start):
+        """Slide the window of bins along the grid (counts keep their grid positions)"""
+        moved = np.zeros(self.bins, dtype=np.int64)
+        occupied = np.flatnonzero(self.counts)
+        moved[occupied + self.start - start] = self.counts[occupied]
+        self.counts, self.start = moved, start
+
+    def edges(self):
+        return self.origin + (self.start + np.arange(self.bins + 1)) * self.width
+
+
+class ColumnProfile:
+    """All streaming sketches for one column"""
+
+    def __init__(self, name, top_k=DEFAULT_TOP_K):
+        self.name = name
+        self.top_k = top_k
+        self.rows = 0
+        self.nulls = 0
+        self.kinds = set()
+        self.distinct = DistinctSketch()
+        self.frequent = TopKSketch(capacity=max(10 * top_k, 50))
+        self.minimum = None
+        self.maximum = None
+        self.quantiles = QuantileSketch()
+        self.histogram = Histogram()
+
+    def update(self, series):
+        self.rows += len(series)
+        present = series.dropna()
+        self.nulls += len(series) - len(present)
+        if not len(present):
+            return
+
+        if pd.api.types.is_datetime64_any_dtype(present):
+            kind = 'datetime'
+            numbers = present.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+        elif pd.api.types.is_numeric_dtype(present) and not pd.api.types.is_bool_dtype(present):
+            kind = 'numeric'
+            numbers = present.to_numpy(dtype=np.float64)
+        else:
+            kind = 'text'
+            numbers = None
+        self.kinds.add(kind)
+
+        # Numbers are hashed as floats so 1 and 1.0 from differently typed chunks agree
+        hash_input = numbers if numbers is not None else present.astype(str).to_numpy(dtype=object)
+        self.distinct.update(pd.util.hash_array(hash_input))
+        self.frequent.update(present.value_counts(sort=False))
+
+        if numbers is not None:
+            low, high = numbers.min(), numbers.max()
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+            self.quantiles.update(numbers)
+            self.histogram.update(numbers)
+
+    def summary(self):
+        """Plain dictionary of the column's profile"""
+        numeric = bool(self.kinds & {'numeric', 'datetime'})
+        as_value = (lambda x: pd.Timestamp(int(x))) if self.kinds == {'datetime'} else (lambda x: x)
+        summary = {
+            'column': self.name,
+            'kind': '/'.join(sorted(self.kinds)) or 'empty',
+            'rows': self.rows,
+            'null_rate': self.nulls / self.rows if self.rows else 0.0,
+            'distinct': min(self.distinct.estimate(), self.rows - self.nulls),
+            'top': self.frequent.top(self.top_k),
+        }
+        if numeric:
+            p05, p25, p50, p75, p95 = self.quantiles.quantiles([0.05, 0.25, 0.5, 0.75, 0.95])
+            summary.update({
+                'min': as_value(self.minimum), 'max': as_value(self.maximum),
+                'p05': as_value(p05), 'p25': as_value(p25), 'median': as_value(p50),
+                'p75': as_value(p75), 'p95': as_value(p95),
+                'histogram': self.histogram.counts.copy(),
+                'histogram_edges': [as_value(edge) for edge in self.histogram.edges()],
+            })
+        return summary
+
+
+def iter_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrame batches from a CSV path, a DataFrame or an iterable of DataFrames"""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif isinstance(source, str):
+        yield from pd.read_csv(source, chunksize=chunksize, low_memory=False)
+    else:
+        yield from source
+
+
+def profile_dataset(source, chunksize=DEFAULT_CHUNKSIZE, top_k=DEFAULT_TOP_K, n_jobs=1):
+    """Profile every column of a dataset in one pass; returns a list of column summaries
+
+    source is a CSV path, a DataFrame or an iterable of DataFrame chunks.
+    n_jobs > 1 profiles the columns of each chunk on worker threads
+    (n_jobs=-1 uses every CPU).
+    """
+    profiles = {}
+    workers = os.cpu_count() if n_jobs == -1 else max(1, n_jobs)
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for chunk in iter_chunks(source, chunksize):
+            for position, column in enumerate(chunk.columns):
+                if position not in profiles:
+                    profiles[position] = ColumnProfile(str(column), top_k)
+            tasks = [(profiles[position], chunk.iloc[:, position]) for position in range(chunk.shape[1])]
+            if executor is not None:
+                list(executor.map(lambda task: task[0].update(task[1]), tasks))
+            else:
+                for profile, series in tasks:
+                    profile.update(series)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return [profiles[position].summary() for position in sorted(profiles)]
+
+
+def _format_value(value, width=12):
+    if isinstance(value, pd.Timestamp):
+        text = value.strftime('%Y-%m-%d')
+    elif isinstance(value, (float, np.floating)):
+        text = f"{value:.0f}" if float(value).is_integer() else f"{value:.2f}"
+    else:
+        text = str(value)
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def sparkline(counts):
+    """Histogram counts as a one-line bar chart"""
+    counts = np.asarray(counts, dtype=float)
+    if not len(counts) or counts.max() == 0:
+        return ''
+    levels = np.ceil(counts / counts.max() * (len(SPARK_CHARS) - 1)).astype(int)
+    return ''.join(SPARK_CHARS[level] if count else ' ' for level, count in zip(levels, counts))
+
+
+def display_column_profiles(profiles):
+    """Display per-column profiles in a formatted way"""
+    print(f"\n🧬 COLUMN PROFILES:")
+    for profile in profiles:
+        print(f"  • {profile['column']} [{profile['kind']}]: {profile['null_rate'] * 100:.1f}% null, "
+              f"~{profile['distinct']:,} distinct")
+        if 'min' in profile:
+            print(f"      min {_format_value(profile['min'])} | p25 {_format_value(profile['p25'])} | "
+                  f"median {_format_value(profile['median'])} | p75 {_format_value(profile['p75'])} | "
+                  f"max {_format_value(profile['max'])}")
+            print(f"      histogram {_format_value(profile['histogram_edges'][0])} "
+                  f"{sparkline(profile['histogram'])} {_format_value(profile['histogram_edges'][-1])}")
+        if profile['top'] and profile['top'][0][1] > 1:
+            top = ', '.join(f"{_format_value(value, 20)} ({count:,})" for value, count, _ in profile['top'])
+            print(f"      top: {top}")
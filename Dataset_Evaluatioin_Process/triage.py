@@ -0,0 +1,164 @@
+# Fail-early triage for the files in Datasource/
+#
+# Before any file is fully parsed, triage reads only what is cheap: the file
+# size, workbook metadata (sheet names and their recorded dimensions) and the
+# first rows of each CSV or sheet. From that it derives the schema, row-count
+# and memory estimates and rejects files with obvious problems (unreadable,
+# empty, headerless, mostly blank). Files that pass are scheduled for the full
+# analysis smallest first, in rounds whose estimated in-memory size fits the
+# memory budget: files that do not fit are deferred to a later round, run
+# after the earlier datasets have been released, instead of stalling the scan.
+
+import os
+import re
+
+import pandas as pd
+
+DEFAULT_HEAD_ROWS = 200
+DEFAULT_MEMORY_BUDGET = 1024**3
+MAX_HEAD_NULL_RATIO = 0.95  # heads at least this blank are rejected
+MAX_UNNAMED_RATIO = 0.5  # more unnamed columns than this means the header row is missing
+
+
+def _csv_row_estimate(path, head_rows):
+    """Estimate the data rows of a CSV from its size and the width of its first lines"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        lines = [line for line in (f.readline() for _ in range(head_rows)) if line]
+    if not lines:
+        return 0
+    if len(lines) < head_rows:
+        return len(lines)
+    per_row = sum(len(line) for line in lines) / len(lines)
+    return int((os.path.getsize(path) - len(header)) / per_row)
+
+
+def _sheet_dimensions(excel_file, sheet_name):
+    """Data rows and columns recorded in the workbook for a sheet (None if unknown)"""
+    book = excel_file.book
+    try:
+        if hasattr(book, 'sheet_by_name'):  # xlrd (.xls)
+            sheet = book.sheet_by_name(sheet_name)
+            rows, columns = sheet.nrows, sheet.ncols
+        else:  # openpyxl (.xlsx) reads the sheet's <dimension> element
+            sheet = book[sheet_name]
+            rows, columns = sheet.max_row, sheet.max_column
+    except Exception:
+        return None, None
+    return (max(rows - 1, 0) if rows is not None else None), columns
+
+
+def _head_issues(head):
+    """Obvious quality failures visible in the first rows of a table"""
+    issues = []
+    if head.shape[1] == 0:
+        return ['no columns']
+    if head.empty:
+        return ['no data rows']
+    names = [str(col) for col in head.columns]
+    unnamed = sum(name.startswith('Unnamed:') for name in names)
+    if unnamed / len(names) > MAX_UNNAMED_RATIO:
+        issues.append(f'header row missing ({unnamed} of {len(names)} columns unnamed)')
+    duplicated = [name for name in names if re.fullmatch(r'.+\.\d+', name) and name.rsplit('.', 1)[0] in names]
+    if duplicated:
+        issues.append(f"duplicate column names ({', '.join(duplicated[:3])})")
+    null_ratio = head.isna().to_numpy().mean()
+    if null_ratio >= MAX_HEAD_NULL_RATIO:
+        issues.append(f'first {len(head)} rows are {null_ratio:.0%} empty')
+    return issues
+
+
+def _table_summary(name, head, estimated_rows):
+    per_row = head.memory_usage(deep=True).sum() / len(head) if len(head) else 0
+    return {
+        'name': name,
+        'columns': [str(col) for col in head.columns],
+        'head_rows': len(head),
+        'estimated_rows': estimated_rows if estimated_rows is not None else len(head),
+        'estimated_bytes': int(per_row * (estimated_rows if estimated_rows is not None else len(head))),
+        'issues': _head_issues(head),
+    }
+
+
+def triage_file(path, head_rows=DEFAULT_HEAD_ROWS):
+    """Triage one file from its size, metadata and first rows
+
+    Returns a dict with the file size, one summary per table (CSV or sheet)
+    with its columns, estimated rows and memory and any issues, and a status
+    of 'pass' or 'fail' with the reasons.
+    """
+    result = {'file': os.path.basename(path), 'path': path, 'size': os.path.getsize(path),
+              'tables': [], 'reasons': [], 'status': 'pass'}
+    try:
+        if result['size'] == 0:
+            raise ValueError('file is empty')
+        if path.endswith('.csv'):
+            try:
+                head = pd.read_csv(path, nrows=head_rows)
+            except pd.errors.EmptyDataError:
+                raise ValueError('file has no header or data')
+            result['tables'].append(_table_summary(os.path.basename(path), head, _csv_row_estimate(path, head_rows)))
+        else:
+            with pd.ExcelFile(path) as excel_file:
+                for sheet_name in excel_file.sheet_names:
+                    rows, _ = _sheet_dimensions(excel_file, sheet_name)
+                    head = excel_file.parse(sheet_name, nrows=head_rows)
+                    result['tables'].append(_table_summary(sheet_name, head, rows))
+    except Exception as e:
+        result['reasons'].append(f'unreadable: {e}')
+
+    if not result['reasons'] and result['tables']:
+        # A workbook passes if at least one sheet is usable; problems in the others are reported
+        usable = [table for table in result['tables'] if not table['issues']]
+        if not usable:
+            result['reasons'] = [f"{table['name']}: {issue}" for table in result['tables'] for issue in table['issues']]
+    elif not result['reasons']:
+        result['reasons'].append('no sheets')
+    if result['reasons']:
+        result['status'] = 'fail'
+    result['estimated_bytes'] = sum(table['estimated_bytes'] for table in result['tables'])
+    result['estimated_rows'] = sum(table['estimated_rows'] for table in result['tables'])
+    return result
+
+
+def schedule(results, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Pack passing files, smallest first, into rounds whose estimated memory fits the budget
+
+    The datasets of one round may be held together; memory is freed before
+    the next round starts. A file larger than the whole budget gets a round of
+    its own rather than being skipped. Returns the list of rounds (lists of
+    triage results); files after the first round get status 'deferred'.
+    """
+    rounds = []
+    used = 0
+    for result in sorted((r for r in results if r['status'] == 'pass'), key=lambda r: (r['size'], r['file'])):
+        needed = result['estimated_bytes']
+        if not rounds or used + needed > memory_budget:
+            rounds.append([])
+            used = 0
+        rounds[-1].append(result)
+        used += needed
+        if needed > memory_budget:
+            result['reasons'].append(f"needs ~{needed / 1024**2:,.0f} MB, more than the "
+                                     f"{memory_budget / 1024**2:,.0f} MB budget; analysed on its own")
+        if len(rounds) > 1:
+            result['status'] = 'deferred'
+            result['reasons'].append(f"analysed in round {len(rounds)}, after earlier datasets are released")
+    return rounds
+
+
+def display_triage(results):
+    """Display the triage outcome of every file in a formatted way"""
+    markers = {'pass': '✅', 'fail': '❌', 'deferred': '⏸️ '}
+    print(f"\n🚦 FILE TRIAGE: {len(results)} files")
+    for result in sorted(results, key=lambda r: r['file']):
+        tables = len(result['tables'])
+        print(f"  {markers[result['status']]} {result['file']}: {result['size'] / 1024**2:.2f} MB on disk, "
+              f"{tables} table{'s' if tables != 1 else ''}, ~{result['estimated_rows']:,} rows, "
+              f"~{result['estimated_bytes'] / 1024**2:.1f} MB in memory")
+        for reason in result['reasons']:
+            print(f"      • {reason}")
+        if result['status'] == 'pass':
+            for table in result['tables']:
+                for issue in table['issues']:
+                    print(f"      • {table['name']}: {issue}")
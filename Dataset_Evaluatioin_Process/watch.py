@@ -0,0 +1,215 @@
+# Watch mode: re-evaluate (and re-clean) only data files that are new or changed
+#
+# The data directory is polled; a file is picked up once its size and
+# modification time have stayed the same for a settle period, so files that
+# are still being copied are not read half-written. Each ready file is
+# triaged and evaluated with load_and_inspect_dataset, and the Airbnb source
+# also re-runs the ETL clean step. Work runs on a bounded pool of worker
+# processes so a burst of uploads cannot overload the machine. What has been
+# processed is persisted in a state file (signature and content hash per
+# file), so a restarted watcher skips inputs that did not change. Files that
+# failed are retried with exponential backoff, and right away when the
+# watcher restarts after their retry time has passed. The ETL writes the
+# cleaned CSV atomically, so a worker evaluating it in the same batch reads
+# either the previous or the new version, never a partial file.
+
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Shared ETL helpers (memoize, and ETL itself in the workers) are made importable by pipeline.import_stage
+from memoize import fingerprint_file
+from triage import DEFAULT_HEAD_ROWS, triage_file
+
+DEFAULT_DATA_PATH = "Datasource/"
+DEFAULT_STATE_PATH = os.path.join('.cache', 'watch_state.json')
+DEFAULT_INTERVAL = 2.0
+DEFAULT_SETTLE = 5.0
+DEFAULT_WORKERS = 2
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+CLEAN_SOURCES = ('airbnb.xlsx',)  # files that also trigger the ETL clean step
+RETRY_DELAY = 30.0  # seconds before a failed file is retried; doubles with every further failure
+MAX_RETRY_DELAY = 3600.0
+
+
+def load_state(path=DEFAULT_STATE_PATH):
+    """Processed files from a previous run ({filename: record}); empty if missing"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['files']
+
+
+def save_state(state, path=DEFAULT_STATE_PATH):
+    """Write the state atomically so a crash never leaves a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': 1, 'files': state}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def scan(data_path):
+    """Signature (size, mtime in ns) of every supported file in the directory"""
+    signatures = {}
+    for filename in sorted(os.listdir(data_path)):
+        if filename.startswith('.') or filename.startswith('~$') or not filename.endswith(SUPPORTED_EXTENSIONS):
+            continue
+        path = os.path.join(data_path, filename)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            signatures[filename] = [stat.st_size, stat.st_mtime_ns]
+    return signatures
+
+
+class Debouncer:
+    """Report files only after their signature has been stable for settle seconds"""
+
+    def __init__(self, settle=DEFAULT_SETTLE):
+        self.settle = settle
+        self.pending = {}  # filename -> (signature, first time it was seen with that signature)
+
+    def ready(self, signatures, now=None):
+        now = time.monotonic() if now is None else now
+        ready = []
+        for filename, signature in signatures.items():
+            seen = self.pending.get(filename)
+            if seen is None or seen[0] != signature:
+                self.pending[filename] = seen = (signature, now)
+            if now - seen[1] >= self.settle:
+                ready.append(filename)
+        for filename in set(self.pending) - set(signatures):
+            del self.pending[filename]
+        return ready
+
+
+def process_file(data_path, filename, clean, head_rows=DEFAULT_HEAD_ROWS):
+    """Triage, evaluate and optionally clean one file (runs in a worker process)
+
+    Returns (filename, ok, message, captured output) so output from parallel
+    workers is printed whole rather than interleaved.
+    """
+    import Dataset_Evaluation_Process as evaluation
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        triaged = triage_file(os.path.join(data_path, filename), head_rows)
+        if triaged['status'] != 'pass':
+            return filename, False, '; '.join(triaged['reasons']), output.getvalue()
+        dataset_name = os.path.splitext(filename)[0]
+        result, message = evaluation.load_and_inspect_dataset(filename, dataset_name, data_path, {})
+        if result is None:
+            return filename, False, message, output.getvalue()
+        if clean:
+            import ETL
+            # The cleaned CSV and the category registry live next to the source, as in Datasource/
+            clean_output = os.path.join(data_path, os.path.basename(ETL.DEFAULT_OUTPUT))
+            registry_path = os.path.join(data_path, os.path.basename(ETL.DEFAULT_REGISTRY))
+            if ETL.main(os.path.join(data_path, filename), clean_output, registry_path=registry_path) != 0:
+                return filename, False, 'ETL clean step failed', output.getvalue()
+            message = f"evaluated and cleaned into {clean_output}"
+        else:
+            message = 'evaluated'
+    return filename, True, message, output.getvalue()
+
+
+def retry_delay(attempts):
+    """Seconds to wait before retrying a file that has failed attempts times"""
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def changed_files(ready, signatures, state, data_path, now=None):
+    """Ready files whose content differs from what the state says was processed
+
+    A file whose timestamp changed but whose content hash did not is only
+    re-stamped in the state, not reprocessed. Unchanged files that failed
+    are returned again once their retry time has passed.
+    """
+    now = time.time() if now is None else now
+    changed = []
+    for filename in ready:
+        record = state.get(filename)
+        if record is None or record['signature'] != signatures[filename]:
+            digest = fingerprint_file(os.path.join(data_path, filename))
+            if record is None or record['sha256'] != digest:
+                changed.append((filename, digest))
+                continue
+            record['signature'] = signatures[filename]
+        if record['status'] == 'failed' and now >= record.get('retry_at', 0):
+            changed.append((filename, record['sha256']))
+    return changed
+
+
+def run_cycle(data_path, state, debouncer, executor, clean_sources=CLEAN_SOURCES, head_rows=DEFAULT_HEAD_ROWS,
+              verbose=True):
+    """One poll: process settled new/changed files, forget removed ones; returns files processed"""
+    signatures = scan(data_path)
+    for filename in sorted(set(state) - set(signatures)):
+        print(f"🗑️  {filename} removed")
+        del state[filename]
+
+    changed = changed_files(debouncer.ready(signatures), signatures, state, data_path)
+    if not changed:
+        return 0
+    digests = dict(changed)
+    jobs = [(data_path, filename, filename in clean_sources, head_rows) for filename, _ in changed]
+    print(f"\n👀 {len(jobs)} new or changed file(s): {', '.join(filename for filename, _ in changed)}")
+    for filename, ok, message, output in executor.map(process_file, *zip(*jobs)):
+        if verbose:
+            print(output, end='')
+        record = {
+            'signature': signatures[filename],
+            'sha256': digests[filename],
+            'status': 'ok' if ok else 'failed',
+            'message': message,
+            'processed_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        if ok:
+            print(f"✅ {filename}: {message}")
+        else:
+            previous = state.get(filename)
+            retried = previous is not None and previous['status'] == 'failed' and previous['sha256'] == digests[filename]
+            record['attempts'] = previous.get('attempts', 1) + 1 if retried else 1
+            delay = retry_delay(record['attempts'])
+            record['retry_at'] = time.time() + delay
+            print(f"❌ {filename}: {message} (retry in {delay:,.0f}s)")
+        state[filename] = record
+    return len(jobs)
+
+
+def watch(data_path=DEFAULT_DATA_PATH, state_path=DEFAULT_STATE_PATH, interval=DEFAULT_INTERVAL,
+          settle=DEFAULT_SETTLE, max_workers=DEFAULT_WORKERS, clean_sources=CLEAN_SOURCES,
+          head_rows=DEFAULT_HEAD_ROWS, once=False, verbose=True):
+    """Poll data_path and process new or changed files until interrupted (returns an exit code)
+
+    once=True processes what is currently settled and returns, e.g. for a cron
+    job. At most max_workers files are processed at the same time.
+    """
+    if not os.path.isdir(data_path):
+        print(f"❌ Data directory not found: {data_path}")
+        return 1
+    state = load_state(state_path)
+    debouncer = Debouncer(0 if once else settle)
+    print(f"👀 Watching {data_path} every {interval:g}s ({len(state)} files already processed, "
+          f"up to {max_workers} at a time)")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while True:
+                processed = run_cycle(data_path, state, debouncer, executor, clean_sources, head_rows, verbose)
+                save_state(state, state_path)
+                if once:
+                    if not processed:
+                        break
+                    continue  # another pass picks up files the clean step just wrote
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\n👋 Stopping watch mode")
+        finally:
+            save_state(state, state_path)
+    return 0
@@ -5,40 +5,112 @@
 # =============================================================================
 
 # 1.1 Import necessary libraries
+# matplotlib and seaborn are imported lazily by load_plotting() so text-only runs
+# (e.g. `python pipeline.py report`) do not pay for the plotting stack at startup
+import os
+import sys
+import time
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-# Set visualization style for consistency
-plt.style.use('seaborn-v0_8-whitegrid')  # Modern, clean style
-sns.set_palette("deep")  # Color palette suitable for business presentations
+# Shared helpers live with the ETL (stage folders are plain script directories). pipeline.import_stage
+# already makes them importable; this keeps `python EDA.py` working when the script is run directly.
+ETL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ETL_Process')
+if ETL_DIR not in sys.path:
+    sys.path.insert(0, ETL_DIR)
+from price_drivers import compute_price_drivers, display_price_drivers
+from price_model import fit_price_model, display_price_model
+from bootstrap import bootstrap_group_ci, display_group_ci
+from cohorts import summarize_chunk, cohort_trends, display_cohort_trends
+from sampling import (DEFAULT_SAMPLE_DIR, DEFAULT_MIN_PER_STRATUM, estimate_rows, fraction_for_budget,
+                      load_throughput, record_throughput, load_or_build_sample,
+                      display_sample_summary, display_sample_estimates)
+
+from partitions import MANIFEST_NAME, read_manifest, read_partitioned, iter_partitioned, apply_filters
+from categories import DEFAULT_REGISTRY, load_registry, encode_columns, display_unknown_values
+from outliers import compute_bounds, apply_bounds, display_outlier_report
+from memoize import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, SectionCache, fingerprint_frame, fingerprint_code, fingerprint_file
+
+# Default input location (relative to the repository root)
+DEFAULT_INPUT = os.path.join('Datasource', 'airbnb_clean.csv')
+
+# Text columns encoded with the ETL's category registry (Beds stays numeric for analysis)
+ENCODED_COLUMNS = ['Neighbourhood', 'Room Type', 'Property Type']
+
+_plotting = None
+
+
+def load_plotting():
+    """Import matplotlib and seaborn on first use and apply the shared visual style"""
+    global _plotting
+    if _plotting is None:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        # Set visualization style for consistency
+        plt.style.use('seaborn-v0_8-whitegrid')  # Modern, clean style
+        sns.set_palette("deep")  # Color palette suitable for business presentations
+        _plotting = (plt, sns)
+    return _plotting
+
+
+def show_figure(name, figures_dir=None):
+    """Show the current figure, or save it to figures_dir/<name>.png for unattended runs"""
+    plt, _ = load_plotting()
+    if figures_dir:
+        os.makedirs(figures_dir, exist_ok=True)
+        plt.savefig(os.path.join(figures_dir, f"{name}.png"), bbox_inches='tight')
+        plt.close()
+    else:
+        plt.show()
+
 
 # 1.2 Load the cleaned Airbnb dataset
-try:
-    df = pd.read_csv('Datasource/airbnb_clean.csv')
-    print('✅ Airbnb cleaned dataset loaded successfully.')
-except Exception as e:
-    print(f'❌ Error loading dataset: {e}')
-    df = None
+def load_data(input_path=DEFAULT_INPUT, filters=None, registry_path=DEFAULT_REGISTRY):
+    """Load the cleaned Airbnb dataset (returns None on failure)
+
+    input_path may be the cleaned CSV or a partitioned dataset directory written
+    by the ETL; filters is a list of (column, op, value) predicates, and for a
+    partitioned directory only the files that can match them are read.
+    Categorical columns are encoded with the ETL's category registry when it
+    exists; values missing from it are reported and set to missing.
+    """
+    try:
+        if os.path.isdir(input_path):
+            df = read_partitioned(input_path, filters)
+        else:
+            df = pd.read_csv(input_path)
+            if filters:
+                df = apply_filters(df, filters).reset_index(drop=True)
+        registry = load_registry(registry_path) if registry_path else {}
+        if registry:
+            df, unknown = encode_columns(df, registry, ENCODED_COLUMNS, on_unknown='flag')
+            display_unknown_values(unknown, 'flag')
+            # Filtered loads may not contain every registered value; keep counts and groupbys to observed ones
+            for column in ENCODED_COLUMNS:
+                if column in df.columns:
+                    df[column] = df[column].cat.remove_unused_categories()
+        print('✅ Airbnb cleaned dataset loaded successfully.')
+    except Exception as e:
+        print(f'❌ Error loading dataset: {e}')
+        df = None
+    return df
 
 # =============================================================================
 # SECTION 2: DATA QUALITY ASSESSMENT
 # =============================================================================
 
 # 2.1 Preview the dataset
-if df is not None:
+def preview_data(df):
     print("\n=== DATA PREVIEW ===")
     print(df.head())           # Show the first 5 rows
     print("\n=== DATA INFORMATION ===")
     print(df.info())           # Show data types and non-null counts
     print("\n=== SUMMARY STATISTICS ===")
     print(df.describe())       # Show summary statistics
-else:
-    print('No data loaded to preview.')
 
 # 2.2 Check for missing values and data types
-if df is not None:
+def check_data_quality(df):
     print('\n=== DATA QUALITY CHECK ===')
     print('Missing values per column:')
     print(df.isnull().sum())
@@ -52,8 +124,6 @@ if df is not None:
     
     # Check for duplicates
     print(f'\nNumber of duplicate rows: {df.duplicated().sum()}')
-else:
-    print('No data loaded to check for missing values or data types.')
 
 # =============================================================================
 # SECTION 3: BUSINESS QUESTIONS & ANALYSIS GOALS
@@ -68,6 +138,11 @@ else:
 #    Note: Initial analysis shows limited variability in review counts, so this question
 #    will be addressed at a high level with the available data.
 
+# 3.1 Price driver table (question 1): correlation, ANOVA and mutual information
+def analyze_price_drivers(df):
+    price_drivers = compute_price_drivers(df)
+    display_price_drivers(price_drivers)
+
 # =============================================================================
 # SECTION 4: UNIVARIATE ANALYSIS
 # =============================================================================
@@ -76,7 +151,9 @@ else:
 # Analyze: Price, Review Scores Rating, Number Of Reviews, Number of Records, Beds
 # Business Focus: Understanding pricing distribution, rating patterns, and booking frequency
 
-if df is not None:
+def plot_numerical_distributions(df, figures_dir=None):
+    plt, sns = load_plotting()
+    
     # Set up figure size for numerical variables analysis
     plt.figure(figsize=(18, 12))
     
@@ -140,8 +217,10 @@ if df is not None:
                         bottom=0.05) # Reduce bottom margin
     
     # Add a main title with adjusted position
-    plt.show()
-        
+    show_figure('numerical_distributions', figures_dir)
+
+
+def numerical_insights(df):
     # Business insights from numerical variables
     print("\n=== NUMERICAL VARIABLES BUSINESS INSIGHTS ===")
     
@@ -168,70 +247,72 @@ if df is not None:
     print(f"• Average number of beds: {avg_beds:.2f}")
     most_common_beds = df['Beds'].mode()[0]
     print(f"• Most common bed configuration: {most_common_beds}")
-else:
-    print('No data loaded to analyze numerical variable distributions.')
 #endregion
 
 # region 4.2 Categorical Variables Distribution
 # Analyze: Neighbourhood, Zipcode, Property Type, Room Type
 # Business Focus: Identifying popular areas, property types, and pricing strategies by segment
 
-if df is not None:
+# Define categorical columns to analyze
+categorical_cols = ['Neighbourhood', 'Zipcode', 'Property Type', 'Room Type']
+
+# Function to plot top N categories for a categorical variable
+def plot_top_categories(data, column, axis, top_n=10, title=None, color=None):
+    plt, _ = load_plotting()
+    counts = data[column].value_counts().nlargest(top_n)
+    bars = counts.plot(kind='bar', ax=axis, color=color)
+    axis.set_title(title if title else f'Top {top_n} {column}s', fontdict={'fontsize': 9, 'weight': 'bold'})
+    axis.grid(True, axis='y', alpha=0.3, linestyle='--')
+
+    # Add percentage labels to bars
+    total = len(data)
+    for i, v in enumerate(counts):
+        percentage = (v / total) * 100
+        axis.text(i, v + 0.1, f"{v}\n({percentage:.1f}%)", ha='center', fontsize= 8)
+
+    # Improve x-axis labels and y-axis labels
+    plt.setp(axis.xaxis.get_majorticklabels(), rotation=45, ha='right', rotation_mode='anchor', fontsize=8)
+    plt.setp(axis.yaxis.get_majorticklabels(), fontsize=8)
+
+    return counts
+
+# Function to calculate and display category percentages with business insights
+def display_category_percentages(data, column, top_n=10):
+    total = len(data)
+    counts = data[column].value_counts().nlargest(top_n)
+    percentages = (counts / total * 100).round(1)
+
+    # Calculate average price by category
+    category_prices = data.groupby(column)['Price'].agg(['mean', 'median', 'count'])
+    category_prices = category_prices.loc[counts.index]
+
+    print(f"\n=== {column.upper()} DISTRIBUTION ===")
+    for cat, count in counts.items():
+        pct = percentages[cat]
+        avg_price = category_prices.loc[cat, 'mean']
+        median_price = category_prices.loc[cat, 'median']
+        print(f"• {cat}: {count} listings ({pct}% of market) | Avg Price: ${avg_price:.0f} | Median: ${median_price:.0f}")
+
+    # Calculate concentration
+    top_concentration = percentages.sum()
+    print(f"• Market concentration: Top {top_n} {column.lower()}s represent {top_concentration:.1f}% of all listings")
+
+    # Price comparison
+    overall_avg = data['Price'].mean()
+    highest_price_cat = category_prices['mean'].idxmax()
+    highest_price = category_prices.loc[highest_price_cat, 'mean']
+    print(f"• Pricing insights: {highest_price_cat} has the highest average price (${highest_price:.0f} vs. overall ${overall_avg:.0f})")
+
+
+def plot_categorical_distributions(df, figures_dir=None):
+    plt, sns = load_plotting()
+    
     # Set up figure size for categorical variables analysis
     plt.figure(figsize=(20, 18))
     
-    # Define categorical columns to analyze
-    categorical_cols = ['Neighbourhood', 'Zipcode', 'Property Type', 'Room Type']
-    
     # Color palette for consistent visuals
     colors = plt.cm.tab10.colors
     
-    # Function to plot top N categories for a categorical variable
-    def plot_top_categories(data, column, axis, top_n=10, title=None, color=None):
-        counts = data[column].value_counts().nlargest(top_n)
-        bars = counts.plot(kind='bar', ax=axis, color=color)
-        axis.set_title(title if title else f'Top {top_n} {column}s', fontdict={'fontsize': 9, 'weight': 'bold'})
-        axis.grid(True, axis='y', alpha=0.3, linestyle='--')
-        
-        # Add percentage labels to bars
-        total = len(data)
-        for i, v in enumerate(counts):
-            percentage = (v / total) * 100
-            axis.text(i, v + 0.1, f"{v}\n({percentage:.1f}%)", ha='center', fontsize= 8)
-        
-        # Improve x-axis labels and y-axis labels
-        plt.setp(axis.xaxis.get_majorticklabels(), rotation=45, ha='right', rotation_mode='anchor', fontsize=8)
-        plt.setp(axis.yaxis.get_majorticklabels(), fontsize=8)
-        
-        return counts
-    
-    # Function to calculate and display category percentages with business insights
-    def display_category_percentages(data, column, top_n=10):
-        total = len(data)
-        counts = data[column].value_counts().nlargest(top_n)
-        percentages = (counts / total * 100).round(1)
-        
-        # Calculate average price by category
-        category_prices = data.groupby(column)['Price'].agg(['mean', 'median', 'count'])
-        category_prices = category_prices.loc[counts.index]
-        
-        print(f"\n=== {column.upper()} DISTRIBUTION ===")
-        for cat, count in counts.items():
-            pct = percentages[cat]
-            avg_price = category_prices.loc[cat, 'mean']
-            median_price = category_prices.loc[cat, 'median']
-            print(f"• {cat}: {count} listings ({pct}% of market) | Avg Price: ${avg_price:.0f} | Median: ${median_price:.0f}")
-        
-        # Calculate concentration
-        top_concentration = percentages.sum()
-        print(f"• Market concentration: Top {top_n} {column.lower()}s represent {top_concentration:.1f}% of all listings")
-        
-        # Price comparison
-        overall_avg = data['Price'].mean()
-        highest_price_cat = category_prices['mean'].idxmax()
-        highest_price = category_prices.loc[highest_price_cat, 'mean']
-        print(f"• Pricing insights: {highest_price_cat} has the highest average price (${highest_price:.0f} vs. overall ${overall_avg:.0f})")
-    
     # Plot Neighbourhood distribution (first column, first row)
     ax1 = plt.subplot(3, 2, 1)
     top_neighborhoods = plot_top_categories(df, 'Neighbourhood', ax1, top_n=10,title='Top Neighbourhoods by Listing Count', color=colors[0])
@@ -313,8 +394,10 @@ if df is not None:
     plt.tight_layout(pad=3.0)
     plt.subplots_adjust(hspace=0.35, wspace=0.25, top=0.92)
     plt.suptitle("Categorical Variables Analysis - Market Segments and Pricing", fontsize=18, y=0.98)
-    plt.show()
-    
+    show_figure('categorical_distributions', figures_dir)
+
+
+def categorical_insights(df):
     # Print business insights about categorical variables
     print("\n=== CATEGORICAL VARIABLES BUSINESS INSIGHTS ===")
     
@@ -329,49 +412,25 @@ if df is not None:
     # Calculate market concentration metrics
     total_listings = len(df)
     
-    # Neighborhood concentration and pricing premium
-    neighborhood_data = df.groupby('Neighbourhood').agg({
-        'Host Id': 'count',
-        'Price': ['mean', 'median', 'std']
-    })
-    neighborhood_data.columns = ['Listings', 'Avg_Price', 'Median_Price', 'Price_Std']
+    # Neighborhood concentration
+    neighborhood_data = df.groupby('Neighbourhood', observed=True).agg({'Host Id': 'count'})
+    neighborhood_data.columns = ['Listings']
     neighborhood_data['Market_Share'] = (neighborhood_data['Listings'] / total_listings * 100).round(1)
-    neighborhood_data['Price_Premium'] = ((neighborhood_data['Avg_Price'] / df['Price'].mean() - 1) * 100).round(1)
-    
-    # Most expensive neighborhood
-    most_expensive = neighborhood_data.sort_values('Avg_Price', ascending=False).index[0]
-    premium_pct = neighborhood_data.loc[most_expensive, 'Price_Premium']
-    print(f"• Premium neighborhood: {most_expensive} commands {premium_pct:+.1f}% price premium vs. market average")
     
     # Most popular neighborhood
     most_popular = neighborhood_data.sort_values('Listings', ascending=False).index[0]
     market_share = neighborhood_data.loc[most_popular, 'Market_Share']
     print(f"• Market leader: {most_popular} holds {market_share:.1f}% market share with {int(neighborhood_data.loc[most_popular, 'Listings'])} listings")
     
-    # Property type insights
-    property_data = df.groupby('Property Type').agg({'Host Id': 'count','Price': ['mean', 'median']
-    }).iloc[:, :3]
-    property_data.columns = ['Listings', 'Avg_Price', 'Median_Price']
-    property_data['Market_Share'] = (property_data['Listings'] / total_listings * 100).round(1)
-    
-    # Most profitable property type
-    most_profitable = property_data.sort_values('Avg_Price', ascending=False).index[0]
-    profit_premium = ((property_data.loc[most_profitable, 'Avg_Price'] / df['Price'].mean() - 1) * 100).round(1)
-    print(f"• Highest revenue opportunity: {most_profitable} listings average ${property_data.loc[most_profitable, 'Avg_Price']:.0f}/night ({profit_premium:+.1f}% vs. market)")
-    
-    # Room type insights with price premium calculation
-    room_data = df.groupby('Room Type').agg({'Host Id': 'count','Price': ['mean', 'median']}).iloc[:, :3]
-    room_data.columns = ['Listings', 'Avg_Price', 'Median_Price']
-    room_data['Market_Share'] = (room_data['Listings'] / total_listings * 100).round(1)
-    
-    # Entire home premium calculation
-    if 'Entire home/apt' in room_data.index and 'Private room' in room_data.index:
-        entire_home_premium = ((room_data.loc['Entire home/apt', 'Avg_Price'] / room_data.loc['Private room', 'Avg_Price'] - 1) * 100).round(1)
-        print(f"• Entire home premium: {entire_home_premium:+.1f}% price premium over private rooms")
+    # Neighbourhood, property type and room type premiums come from the price model, which
+    # holds the other factors constant (fitted from chunk-accumulated normal equations);
+    # raw group-mean premiums mixed location with room type and property mix
+    price_model = fit_price_model(df)
+    display_price_model(price_model)
     
     # Price-to-bed ratio analysis
-    df['Price_per_Bed'] = df['Price'] / df['Beds']
-    best_value_type = df.groupby('Property Type')['Price_per_Bed'].median().nsmallest(1).index[0]
+    price_per_bed = (df['Price'] / df['Beds']).rename('Price_per_Bed')
+    best_value_type = price_per_bed.groupby(df['Property Type']).median().nsmallest(1).index[0]
     print(f"• Best value proposition: {best_value_type} offers lowest price-to-bed ratio")
     
     # Most common property configuration
@@ -379,8 +438,6 @@ if df is not None:
     config_index = most_common_config.index[0]
     config_share = (most_common_config.iloc[0] / total_listings * 100).round(1)
     print(f"• Most common offering: {config_index[0]} with {config_index[1]} ({config_share:.1f}% of market)")
-else:
-    print('No data loaded to analyze categorical variable distributions.')
 #endregion
 
 # =============================================================================
@@ -396,7 +453,9 @@ else:
 # Business Focus: Identifying high-value locations and market saturation
 
 # Write your code for location-based analysis below:
-if df is not None:
+def plot_location_analysis(df, figures_dir=None):
+    plt, sns = load_plotting()
+    
     # Set figure aesthetics for business presentation with consistent style
     plt.figure(figsize=(20, 24))
     
@@ -531,8 +590,10 @@ if df is not None:
     plt.tight_layout(pad=3.0)
     plt.subplots_adjust(hspace=0.35, wspace=0.25, top=0.92, left=0.1, right=0.95, bottom=0.05)
     plt.suptitle("Location-Based Analysis - Market Distribution and Pricing", fontsize=18, y=0.98)
-    plt.show()
-    
+    show_figure('location_analysis', figures_dir)
+
+
+def location_insights(df):
     # Calculate and print business insights related to location
     print("\n=== LOCATION-BASED BUSINESS INSIGHTS ===")
     
@@ -579,6 +640,16 @@ if df is not None:
     for idx, row in top_market_neighborhoods.iterrows():
         print(f"  - {idx}: {int(row['Listing_Count'])} listings ({row['Market_Share']}% market share), ${row['Avg_Price']:.0f}/night, Rating: {row['Avg_Rating']:.1f}/100")
     
+    # Uncertainty of the rankings above: bootstrap confidence intervals for every group at once
+    min_listings = 5
+    price_ci = bootstrap_group_ci(df, 'Neighbourhood', 'Price', min_count=min_listings, seed=42)
+    rating_ci = bootstrap_group_ci(df, 'Neighbourhood', 'Review Scores Rating', min_count=min_listings, seed=42)
+    segment_ci = bootstrap_group_ci(df, ['Neighbourhood', 'Room Type'], 'Price', min_count=min_listings, seed=42)
+    display_group_ci(price_ci, 'Premium neighborhoods by average price', prefix='$', suffix='/night', min_count=min_listings)
+    display_group_ci(rating_ci, 'Highest rated neighborhoods', suffix='/100', min_count=min_listings)
+    display_group_ci(segment_ci, 'Premium segments (Neighbourhood / Room Type) by median price', prefix='$', sort_by='median',
+                     min_count=min_listings)
+    
     # Identify potential investment opportunities (high ratings but below average prices)
     avg_price = df['Price'].mean()
     opportunity_neighborhoods = popular_neighborhoods[(popular_neighborhoods['Avg_Rating'] > 85) & (popular_neighborhoods['Avg_Price'] < avg_price)].sort_values('Avg_Rating', ascending=False)
@@ -626,10 +697,7 @@ if df is not None:
         for _, row in neighborhoods_in_zipcode.iterrows():
             percentage = (row['Count'] / total_listings) * 100
             print(f"  - {row['Neighbourhood']}: {row['Count']} listings ({percentage:.1f}% of zipcode)")
-    
-    
-else:
-    print('No data loaded to analyze location-based relationships.')
+
 
 # =============================================================================
 # 5.2 Property Characteristics Analysis
@@ -641,6 +709,44 @@ else:
 #
 # Business Focus: Understanding pricing determinants and market segments
 
+# =============================================================================
+# 5.3 Host Cohort Analysis
+# =============================================================================
+# Business Focus: Do hosts who joined in different years price and rate differently?
+
+def cohort_insights(df):
+    # Bucket hosts by signup year (Host Since) and compare price and rating per cohort
+    print("\n=== HOST COHORT INSIGHTS ===")
+    trends = cohort_trends(summarize_chunk(df), 'year', by=[])
+    display_cohort_trends(trends, 'year')
+    established = trends[trends['listings'] >= 100]
+    if len(established) > 1:
+        highest, lowest = established['avg_price'].idxmax(), established['avg_price'].idxmin()
+        print(f"\n• Among cohorts with at least 100 listings, {highest} hosts charge the most "
+              f"(${established.loc[highest, 'avg_price']:.2f} on average) and {lowest} hosts the least "
+              f"(${established.loc[lowest, 'avg_price']:.2f})")
+
+
+# =============================================================================
+# 5.4 Robust Outlier Analysis
+# =============================================================================
+# Business Focus: How much do extreme nightly prices distort the neighbourhood averages above?
+
+def outlier_insights(df):
+    # Flag outliers against per Neighbourhood x Room Type IQR bounds, then compare raw and winsorized averages
+    print("\n=== OUTLIER INSIGHTS ===")
+    bounds = compute_bounds(df, method='iqr')
+    winsorized, counts = apply_bounds(df, bounds, 'winsorize')
+    display_outlier_report(bounds, counts, 'iqr')
+
+    raw = df.groupby('Neighbourhood', observed=True)['Price'].agg(['mean', 'std'])
+    robust = winsorized.groupby('Neighbourhood', observed=True)['Price'].agg(['mean', 'std'])
+    print("\n• Price by neighbourhood, raw vs. winsorized to the group bounds:")
+    for neighbourhood in raw.sort_values('mean', ascending=False).index:
+        print(f"  - {neighbourhood}: mean ${raw.loc[neighbourhood, 'mean']:.2f} → ${robust.loc[neighbourhood, 'mean']:.2f}, "
+              f"std ${raw.loc[neighbourhood, 'std']:.2f} → ${robust.loc[neighbourhood, 'std']:.2f}")
+
+
 # =============================================================================
 # SECTION 6: ADVANCED ANALYSIS
 # =============================================================================
@@ -660,3 +766,107 @@ else:
 # please refer to the Airbnb_Analysis_Conclusions.md file, which contains all the
 # extracted insights from the EDA process.
 
+
+def run_eda(df, plots=True, figures_dir=None, cache=None):
+    """Run every EDA section on a loaded DataFrame (plots=False gives a text-only report)
+
+    With a SectionCache, each section is keyed on a fingerprint of df and its
+    parameters and replayed from disk when unchanged. Figures are only cached
+    when they are saved to figures_dir (interactive windows cannot be replayed).
+    """
+    steps = [(preview_data, {}), (check_data_quality, {}), (analyze_price_drivers, {})]
+    if plots:
+        steps.append((plot_numerical_distributions, {'figures_dir': figures_dir}))
+    steps.append((numerical_insights, {}))
+    if plots:
+        steps.append((plot_categorical_distributions, {'figures_dir': figures_dir}))
+    steps.append((categorical_insights, {}))
+    if plots:
+        steps.append((plot_location_analysis, {'figures_dir': figures_dir}))
+    steps.append((location_insights, {}))
+    steps.append((cohort_insights, {}))
+    steps.append((outlier_insights, {}))
+
+    data_fingerprint = fingerprint_frame(df) if cache is not None else None
+    for section, kwargs in steps:
+        interactive = 'figures_dir' in kwargs and not figures_dir
+        if cache is None or interactive:
+            section(df, **kwargs)
+        else:
+            cache.run(section.__name__, section, (df,), kwargs, data_fingerprint=data_fingerprint,
+                      outputs_dir=kwargs.get('figures_dir'))
+
+
+def open_section_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """Section cache whose keys also cover the source of every EDA and ETL module the sections import"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    # Every loaded module from this folder or ETL_Process, so a new helper import can't leave stale entries
+    local_dirs = {here, os.path.abspath(ETL_DIR)}
+    sources = sorted({os.path.abspath(module.__file__) for module in list(sys.modules.values())
+                      if getattr(module, '__file__', None)
+                      and os.path.dirname(os.path.abspath(module.__file__)) in local_dirs})
+    return SectionCache(os.path.join(cache_dir, 'eda'), max_bytes, code_version=fingerprint_code(*sources))
+
+
+def prepare_sample(input_path=DEFAULT_INPUT, filters=None, fraction=None, budget_seconds=None,
+                   min_per_stratum=DEFAULT_MIN_PER_STRATUM, sample_dir=DEFAULT_SAMPLE_DIR, chunksize=50_000):
+    """Find or draw the stratified sample for approximate mode; returns (sample path, metadata)
+
+    The fraction is given directly or derived from budget_seconds and the
+    throughput of the last timed run.
+    """
+    if os.path.isdir(input_path):
+        fingerprint = fingerprint_file(os.path.join(input_path, MANIFEST_NAME))
+        total_rows = read_manifest(input_path)['total_rows']
+        chunks = lambda: iter_partitioned(input_path, filters)
+    else:
+        fingerprint = fingerprint_file(input_path)
+        total_rows = estimate_rows(input_path)
+        chunks = lambda: (apply_filters(chunk, filters) if filters else chunk
+                          for chunk in pd.read_csv(input_path, chunksize=chunksize))
+    if fraction is None:
+        fraction = fraction_for_budget(total_rows, budget_seconds, load_throughput(sample_dir))
+    return load_or_build_sample(input_path, fingerprint, chunks, fraction, min_per_stratum,
+                                filters=filters, sample_dir=sample_dir)
+
+
+def main(input_path=DEFAULT_INPUT, plots=True, figures_dir=None, filters=None, registry_path=DEFAULT_REGISTRY,
+         cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES, sample_fraction=None, sample_budget=None,
+         sample_min=DEFAULT_MIN_PER_STRATUM, sample_dir=DEFAULT_SAMPLE_DIR):
+    """Load the cleaned dataset and run the EDA (returns a process exit code)
+
+    With cache_dir, section outputs are memoized there (see run_eda). With
+    sample_fraction or sample_budget (seconds), the EDA runs on a persisted
+    stratified sample and ends with weighted estimates and margins of error.
+    """
+    meta = None
+    if sample_fraction or sample_budget:
+        try:
+            input_path, meta = prepare_sample(input_path, filters, sample_fraction, sample_budget, sample_min, sample_dir)
+        except Exception as e:
+            print(f'❌ Error sampling dataset: {e}')
+            return 1
+        filters = None
+    df = load_data(input_path, filters, registry_path)
+    if df is None:
+        print('No data loaded to run the analysis.')
+        return 1
+    if df.empty:
+        print('❌ No rows match the filters; nothing to analyse.')
+        return 1
+    if meta is not None:
+        display_sample_summary(meta)
+    cache = open_section_cache(cache_dir, cache_max_bytes) if cache_dir else None
+    start = time.perf_counter()
+    run_eda(df, plots=plots, figures_dir=figures_dir, cache=cache)
+    if meta is not None:
+        display_sample_estimates(df, meta)
+    if cache is None or cache.hits == 0:
+        record_throughput(len(df), time.perf_counter() - start, sample_dir)
+    if cache is not None:
+        print(f"\n{cache.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
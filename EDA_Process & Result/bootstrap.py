@@ -0,0 +1,141 @@
+# Batched bootstrap confidence intervals for group statistics
+#
+# Every group is resampled at once: rows are sorted by (group, value), and each
+# block of resamples is a (resamples x rows) index matrix where row i of group g
+# draws uniformly from [start_g, start_g + count_g). The draws are reduced to
+# per-row multiplicities with a single np.bincount, so group means come from
+# np.add.reduceat over (multiplicity x value). Because groups occupy disjoint,
+# ordered index ranges and values are sorted inside each group, the k-th
+# smallest draw of group g is the (start_g + k)-th draw overall, which is found
+# with np.searchsorted on the cumulative multiplicities: medians need no sort.
+# There is no Python loop over resamples or groups; memory is capped by
+# processing resamples in blocks.
+
+import pandas as pd
+import numpy as np
+
+DEFAULT_BLOCK_BYTES = 32 * 1024**2  # memory budget for one resample block (cache friendly)
+
+
+def _prepare_groups(df, group_cols, value_col):
+    """Sort values by (group, value) and return values, group keys, starts and counts"""
+    data = df[list(group_cols) + [value_col]].copy()
+    data[value_col] = pd.to_numeric(data[value_col], errors='coerce')
+    data = data.dropna()
+
+    codes = data.groupby(list(group_cols), sort=True, observed=True).ngroup().to_numpy()
+    values = data[value_col].to_numpy(dtype=float)
+    order = np.lexsort((values, codes))
+    values = values[order]
+    codes = codes[order]
+
+    counts = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    keys = data.iloc[order].drop_duplicates(subset=list(group_cols))[list(group_cols)]
+    index = pd.MultiIndex.from_frame(keys) if len(group_cols) > 1 else pd.Index(keys[group_cols[0]])
+    return values, index, starts, counts
+
+
+def _median_positions(starts, counts):
+    """Positions of the lower and upper middle element of each group segment"""
+    return starts + (counts - 1) // 2, starts + counts // 2
+
+
+def _bootstrap_block(values, starts, counts, n_resamples, seed, stats):
+    """Draw one block of resamples for every group and return the per-group statistics"""
+    rng = np.random.default_rng(seed)
+    n_rows = len(values)
+    row_starts = np.repeat(starts, counts)
+    row_counts = np.repeat(counts, counts)
+    offsets = (np.arange(n_resamples, dtype=np.int64) * n_rows)[:, None]
+
+    # (resamples x rows) matrix of indices into the sorted values, offset per resample
+    draws = rng.random((n_resamples, n_rows), dtype=np.float32)
+    draws *= row_counts
+    np.minimum(draws, row_counts - 1, out=draws)  # guard against float32 rounding up to count
+    idx = draws.astype(np.int64)
+    del draws
+    idx += row_starts + offsets
+    weights = np.bincount(idx.ravel(), minlength=n_resamples * n_rows).reshape(n_resamples, n_rows)
+    del idx
+
+    results = {}
+    if 'mean' in stats:
+        results['mean'] = np.add.reduceat(weights * values, starts, axis=1) / counts
+    if 'median' in stats:
+        # Cumulative multiplicities made globally increasing across resamples
+        cumulative = np.cumsum(weights, axis=1) + offsets
+        lower, upper = _median_positions(starts, counts)
+        positions = []
+        for rank in (lower, upper):
+            found = np.searchsorted(cumulative.ravel(), (offsets + rank).ravel(), side='right')
+            positions.append(found.reshape(n_resamples, -1) - offsets)
+        results['median'] = (values[positions[0]] + values[positions[1]]) / 2
+    return results
+
+
+def bootstrap_group_ci(df, group_cols, value_col, stats=('mean', 'median'), n_resamples=1000,
+                       confidence=0.95, min_count=1, seed=None, max_block_bytes=DEFAULT_BLOCK_BYTES):
+    """Percentile bootstrap confidence intervals for the mean/median of every group
+
+    Returns one row per group with the count, the point estimate of each
+    statistic and its lower/upper confidence bounds (no rows, but the same
+    columns, when no group has min_count values). Resamples are processed in
+    blocks sized to max_block_bytes; results depend only on seed.
+    """
+    if isinstance(group_cols, str):
+        group_cols = [group_cols]
+    stats = tuple(stats)
+    unknown = set(stats) - {'mean', 'median'}
+    if unknown:
+        raise ValueError(f"Unsupported bootstrap statistics: {sorted(unknown)}")
+
+    values, index, starts, counts = _prepare_groups(df, group_cols, value_col)
+    keep = counts >= min_count
+    if not keep.all():
+        # Re-pack only the groups that are large enough
+        mask = np.repeat(keep, counts)
+        values = values[mask]
+        index = index[keep]
+        counts = counts[keep]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+
+    ordered = ['count'] + [name for stat in stats for name in (stat, f'{stat}_low', f'{stat}_high')]
+    columns = {'count': counts}
+    if len(values) == 0:
+        return pd.DataFrame({name: counts if name == 'count' else np.empty(0) for name in ordered}, index=index)
+
+    # Point estimates from the original sample
+    if 'mean' in stats:
+        columns['mean'] = np.add.reduceat(values, starts) / counts
+    if 'median' in stats:
+        lower, upper = _median_positions(starts, counts)
+        columns['median'] = (values[lower] + values[upper]) / 2
+
+    # Split resamples into memory-bounded blocks with independent seeds
+    block_size = max(1, min(n_resamples, max_block_bytes // (28 * len(values))))
+    sizes = [min(block_size, n_resamples - done) for done in range(0, n_resamples, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    blocks = [_bootstrap_block(values, starts, counts, size, block_seed, stats) for size, block_seed in zip(sizes, seeds)]
+
+    alpha = (1 - confidence) / 2
+    for stat in stats:
+        draws = np.concatenate([block[stat] for block in blocks], axis=0)
+        low, high = np.quantile(draws, [alpha, 1 - alpha], axis=0)
+        columns[f'{stat}_low'] = low
+        columns[f'{stat}_high'] = high
+
+    return pd.DataFrame(columns, index=index)[ordered]
+
+
+def display_group_ci(ci, label, prefix='', suffix='', top_n=5, sort_by='mean', confidence=0.95, min_count=1):
+    """Display groups ranked by a statistic together with their confidence intervals"""
+    print(f"\n• {label} ({confidence:.0%} bootstrap confidence intervals):")
+    if ci.empty:
+        print(f"  - no groups with ≥ {min_count} listings")
+        return
+    for group, row in ci.sort_values(sort_by, ascending=False).head(top_n).iterrows():
+        name = ' / '.join(map(str, group)) if isinstance(group, tuple) else group
+        print(f"  - {name}: {prefix}{row[sort_by]:.1f}{suffix} "
+              f"[{prefix}{row[f'{sort_by}_low']:.1f} – {prefix}{row[f'{sort_by}_high']:.1f}], {int(row['count'])} listings")
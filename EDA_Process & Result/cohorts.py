@@ -0,0 +1,308 @@
+# Host cohort aggregates built from Host Since
+#
+# Hosts are bucketed by the month they signed up (Host Since), and listings
+# are summarised per cohort month x Neighbourhood x Room Type into a small
+# table of mergeable aggregates: listing counts, price and rating sums and
+# sums of squares, review and record totals, price min/max and a fixed
+# log-spaced price histogram (for approximate medians). Cohort trend queries
+# ("how do 2012 hosts price vs. 2015 hosts in Brooklyn") roll this table up by
+# month or year instead of rescanning the listings.
+#
+# The table is stored per batch (e.g. one monthly extract of new listings).
+# Ingesting a new batch only streams that batch and appends its rows;
+# re-ingesting a batch replaces its rows, and an unchanged batch is skipped.
+# Batches are summed, so they must not overlap: a hash of every listing's
+# Host Id + Host Since is kept per batch, and a batch sharing listings with
+# another is rejected (ingest full snapshots under one batch name instead).
+# The summary and batch metadata live in one JSON file written atomically;
+# the listing hashes go to immutable files named after the batch content.
+
+import glob
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+# Shared ETL helpers: made importable by pipeline.import_stage (or EDA.py when run directly)
+from partitions import MANIFEST_NAME, iter_partitioned
+from memoize import fingerprint_file
+from canonical import canonical_values
+
+DEFAULT_INPUT = os.path.join('Datasource', 'airbnb_clean.csv')
+DEFAULT_STORE = os.path.join('.cache', 'host_cohorts.json')  # outside Datasource/, which is scanned as incoming data
+DATE_FORMAT = '%Y-%m-%d'  # Host Since as written to the cleaned CSV by the ETL
+LISTING_KEY = ['Host Id', 'Host Since']  # identifies a listing across batches (the ETL's duplicate key)
+GROUP_COLS = ['Neighbourhood', 'Room Type']
+KEY_COLS = ['cohort'] + GROUP_COLS
+PRICE_BIN_EDGES = np.geomspace(10, 10_000, 65)  # 64 log-spaced bins; prices outside fall in the end bins
+BIN_COLS = [f"price_bin_{i:02d}" for i in range(len(PRICE_BIN_EDGES) - 1)]
+SUM_COLS = ['listings', 'price_n', 'price_sum', 'price_sumsq', 'rating_n', 'rating_sum', 'rating_sumsq',
+            'reviews_sum', 'records_sum'] + BIN_COLS
+GRANULARITIES = {'month': 7, 'year': 4}  # characters of the 'YYYY-MM' cohort label kept
+
+
+def summarize_chunk(chunk):
+    """Cohort aggregates of one batch of listings (rows without a Host Since date are skipped)"""
+    dates = pd.to_datetime(chunk['Host Since'], format=DATE_FORMAT, errors='coerce')
+    price = pd.to_numeric(chunk['Price'], errors='coerce')
+    rating = pd.to_numeric(chunk['Review Scores Rating'], errors='coerce')
+    data = pd.DataFrame({
+        'cohort': dates.dt.strftime('%Y-%m'),
+        'Neighbourhood': chunk['Neighbourhood'].astype(str),
+        'Room Type': chunk['Room Type'].astype(str),
+        'price': price, 'price_sq': price ** 2,
+        'rating': rating, 'rating_sq': rating ** 2,
+        'reviews': pd.to_numeric(chunk['Number Of Reviews'], errors='coerce'),
+        'records': pd.to_numeric(chunk['Number of Records'], errors='coerce'),
+    })
+    data = data[data['cohort'].notna()]
+    grouped = data.groupby(KEY_COLS, sort=True)
+    summary = grouped.agg(
+        listings=('price', 'size'), price_n=('price', 'count'), price_sum=('price', 'sum'),
+        price_sumsq=('price_sq', 'sum'), price_min=('price', 'min'), price_max=('price', 'max'),
+        rating_n=('rating', 'count'), rating_sum=('rating', 'sum'), rating_sumsq=('rating_sq', 'sum'),
+        reviews_sum=('reviews', 'sum'), records_sum=('records', 'sum'),
+    )
+
+    # Price histogram per group from one bincount over (group, bin) pairs
+    n_bins = len(BIN_COLS)
+    priced = data['price'].notna().to_numpy()
+    codes = grouped.ngroup().to_numpy()[priced]
+    bins = np.searchsorted(PRICE_BIN_EDGES[1:-1], data['price'].to_numpy()[priced], side='right')
+    counts = np.bincount(codes * n_bins + bins, minlength=len(summary) * n_bins).reshape(len(summary), n_bins)
+    summary[BIN_COLS] = counts
+    return summary.reset_index()
+
+
+def combine(frames, keys=None):
+    """Merge cohort aggregates that share the same keys"""
+    keys = KEY_COLS if keys is None else keys
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=keys + SUM_COLS + ['price_min', 'price_max'])
+    data = pd.concat(frames, ignore_index=True)
+    aggregations = {col: 'sum' for col in SUM_COLS}
+    aggregations.update(price_min='min', price_max='max')
+    return data.groupby(keys, sort=True).agg(aggregations).reset_index()
+
+
+def iter_source(input_path, chunksize=50_000):
+    """Stream the cleaned CSV or a partitioned dataset directory in chunks"""
+    if os.path.isdir(input_path):
+        return iter_partitioned(input_path)
+    return pd.read_csv(input_path, chunksize=chunksize)
+
+
+def listing_hashes(chunk):
+    """64-bit hash of each listing's Host Id + Host Since, independent of how the chunk was typed"""
+    keys = pd.DataFrame({col: canonical_values(chunk[col]) for col in LISTING_KEY})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def _keys_dir(store_path):
+    return f"{os.path.splitext(store_path)[0]}_keys"
+
+
+def _keys_path(store_path, fingerprint):
+    return os.path.join(_keys_dir(store_path), f"{fingerprint[:16]}.npy")
+
+
+def load_store(store_path=DEFAULT_STORE):
+    """Return (summary table, batch metadata) of the cohort store; empty if it does not exist"""
+    if not os.path.exists(store_path):
+        return combine([], ['batch'] + KEY_COLS), {}
+    with open(store_path) as f:
+        store = json.load(f)
+    summary = pd.DataFrame(store['summary']['data'], columns=store['summary']['columns'])
+    summary = summary.astype({col: str for col in ['batch'] + KEY_COLS})
+    return summary, store['batches']
+
+
+def save_store(summary, batches, store_path=DEFAULT_STORE):
+    """Write the summary table and batch metadata atomically, then drop unreferenced key files
+
+    Both go into one JSON file written under a temporary name and renamed into
+    place, so a crash leaves either the previous store or the new one. Listing
+    key files are written before (see update_store) and never modified.
+    """
+    directory = os.path.dirname(store_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    store = {'version': 2, 'batches': batches, 'summary': summary.to_dict(orient='split', index=False)}
+    tmp_path = f"{store_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(store, f)
+    os.replace(tmp_path, store_path)
+
+    referenced = {_keys_path(store_path, meta['fingerprint']) for meta in batches.values()}
+    for path in glob.glob(os.path.join(_keys_dir(store_path), '*.npy')):
+        if path not in referenced:
+            os.remove(path)
+
+
+def _check_overlap(hashes, batch, batches, store_path):
+    """Raise ValueError if any listing of the new batch is already counted in another batch"""
+    overlaps = {}
+    for name, meta in batches.items():
+        if name == batch:
+            continue
+        shared = int(np.isin(hashes, np.load(_keys_path(store_path, meta['fingerprint']), allow_pickle=False)).sum())
+        if shared:
+            overlaps[name] = shared
+    if overlaps:
+        detail = ', '.join(f"{shared:,} with '{name}'" for name, shared in overlaps.items())
+        raise ValueError(f"Batch '{batch}' shares listings (Host Id + Host Since) with other batches: {detail}. "
+                         f"Batches are summed and must not overlap; re-ingest full snapshots under one batch name")
+
+
+def update_store(input_path, batch, store_path=DEFAULT_STORE, chunksize=50_000):
+    """Add (or replace) one batch of listings in the cohort store
+
+    Returns (summary table, batch metadata, updated) where updated is False
+    when the batch was already ingested from identical data. Raises
+    ValueError when the batch shares listings with another stored batch.
+    """
+    summary, batches = load_store(store_path)
+    source = os.path.join(input_path, MANIFEST_NAME) if os.path.isdir(input_path) else input_path
+    fingerprint = fingerprint_file(source)
+    if batches.get(batch, {}).get('fingerprint') == fingerprint:
+        return summary, batches, False
+
+    parts, hashes = [], []
+    for chunk in iter_source(input_path, chunksize):
+        parts.append(summarize_chunk(chunk))
+        hashes.append(listing_hashes(chunk))
+    hashes = np.unique(np.concatenate(hashes)) if hashes else np.array([], dtype=np.uint64)
+    _check_overlap(hashes, batch, batches, store_path)
+
+    batch_summary = combine(parts)
+    batch_summary.insert(0, 'batch', batch)
+    kept = summary[summary['batch'] != batch]
+    summary = pd.concat([kept, batch_summary], ignore_index=True) if len(kept) else batch_summary
+    batches[batch] = {
+        'source': input_path,
+        'fingerprint': fingerprint,
+        'listings': int(batch_summary['listings'].sum()),
+        'groups': int(len(batch_summary)),
+        'updated_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    os.makedirs(_keys_dir(store_path), exist_ok=True)
+    np.save(_keys_path(store_path, fingerprint), hashes)
+    save_store(summary, batches, store_path)
+    return summary, batches, True
+
+
+def _histogram_quantile(counts, q, lower, upper):
+    """Approximate quantile q per row of a histogram, interpolated on the log price scale"""
+    cumulative = counts.cumsum(axis=1)
+    target = q * cumulative[:, -1]
+    index = (cumulative < target[:, None]).sum(axis=1).clip(max=counts.shape[1] - 1)
+    rows = np.arange(len(counts))
+    before = np.where(index > 0, cumulative[rows, np.maximum(index - 1, 0)], 0)
+    in_bin = counts[rows, index]
+    fraction = np.divide(target - before, in_bin, out=np.full(len(counts), 0.5), where=in_bin > 0)
+    log_edges = np.log(PRICE_BIN_EDGES)
+    estimate = np.exp(log_edges[index] + fraction * (log_edges[index + 1] - log_edges[index]))
+    return np.clip(estimate, lower, upper)
+
+
+def cohort_trends(summary, granularity='year', by=None, neighbourhood=None, room_type=None):
+    """Per-cohort listing counts, price, rating and review figures rolled up from the summary
+
+    granularity is 'month' or 'year'; by lists summary columns to keep apart
+    (default: Neighbourhood). neighbourhood and room_type restrict the rows.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}' (expected one of {', '.join(GRANULARITIES)})")
+    by = ['Neighbourhood'] if by is None else list(by)
+    data = summary
+    if neighbourhood is not None:
+        data = data[data['Neighbourhood'] == neighbourhood]
+    if room_type is not None:
+        data = data[data['Room Type'] == room_type]
+    data = data.assign(cohort=data['cohort'].str[:GRANULARITIES[granularity]])
+    rolled = combine([data], ['cohort'] + by)
+
+    price_mean = rolled['price_sum'] / rolled['price_n']
+    price_var = (rolled['price_sumsq'] - rolled['price_n'] * price_mean ** 2) / (rolled['price_n'] - 1)
+    trends = pd.DataFrame({
+        'cohort': rolled['cohort'],
+        **{col: rolled[col] for col in by},
+        'listings': rolled['listings'].astype(int),
+        'avg_price': price_mean,
+        'price_std': np.sqrt(price_var.clip(lower=0)),
+        'median_price': _histogram_quantile(rolled[BIN_COLS].to_numpy(dtype=float), 0.5,
+                                            rolled['price_min'].to_numpy(dtype=float),
+                                            rolled['price_max'].to_numpy(dtype=float)),
+        'avg_rating': rolled['rating_sum'] / rolled['rating_n'],
+        'reviews_per_listing': rolled['reviews_sum'] / rolled['listings'],
+    })
+    return trends.set_index(by + ['cohort']).sort_index() if by else trends.set_index('cohort')
+
+
+def display_cohort_trends(trends, granularity='year', min_listings=1):
+    """Display cohort trends in a formatted way, one block per group"""
+    print(f"\n🗓️  HOST COHORTS BY SIGNUP {granularity.upper()}")
+    print("=" * 60)
+    levels = trends.index.names[:-1]
+    groups = trends.groupby(level=levels, sort=True) if levels else [(None, trends)]
+    for key, group in groups:
+        if key is not None:
+            label = ' / '.join(str(value) for value in (key if isinstance(key, tuple) else (key,)))
+            print(f"\n  {label}:")
+        print(f"    {'Cohort':<8} {'Listings':>8} {'Avg price':>10} {'Median':>8} {'Rating':>7} {'Reviews':>8}")
+        for row in group.itertuples():
+            if row.listings < min_listings:
+                continue
+            cohort = row.Index[-1] if isinstance(row.Index, tuple) else row.Index
+            print(f"    {cohort:<8} {row.listings:>8,} {row.avg_price:>10.2f} {row.median_price:>8.0f} "
+                  f"{row.avg_rating:>7.1f} {row.reviews_per_listing:>8.1f}")
+
+
+def display_cohort_comparison(trends, first, second):
+    """Compare two cohorts (e.g. '2012' and '2015') within each group of the trends"""
+    print(f"\n⚖️  COHORT {first} vs {second}")
+    print("=" * 60)
+    levels = trends.index.names[:-1]
+    groups = trends.groupby(level=levels, sort=True) if levels else [(None, trends)]
+    for key, group in groups:
+        cohorts = group.droplevel(levels) if levels else group
+        if first not in cohorts.index or second not in cohorts.index:
+            continue
+        a, b = cohorts.loc[first], cohorts.loc[second]
+        label = ' / '.join(str(value) for value in (key if isinstance(key, tuple) else (key,))) if key is not None else 'All'
+        change = (b['avg_price'] / a['avg_price'] - 1) * 100
+        print(f"  • {label}: {first} hosts avg ${a['avg_price']:.2f} ({int(a['listings']):,} listings), "
+              f"{second} hosts avg ${b['avg_price']:.2f} ({int(b['listings']):,} listings), {change:+.1f}%; "
+              f"rating {a['avg_rating']:.1f} vs {b['avg_rating']:.1f}")
+
+
+def main(input_path=DEFAULT_INPUT, store_path=DEFAULT_STORE, batch=None, update=True, granularity='year',
+         by=None, neighbourhood=None, room_type=None, compare=None):
+    """Update the cohort store from input_path and display cohort trends (returns a process exit code)
+
+    batch names the ingested data (default: the input file name); with
+    update=False the stored summary is only queried.
+    """
+    try:
+        if update:
+            batch = batch or os.path.splitext(os.path.basename(os.path.normpath(input_path)))[0]
+            summary, batches, updated = update_store(input_path, batch, store_path)
+            status = 'ingested' if updated else 'unchanged, reused'
+            print(f"✅ Batch '{batch}' {status}: {batches[batch]['listings']:,} listings in "
+                  f"{batches[batch]['groups']:,} cohort groups ({len(batches)} batches, {len(summary):,} rows in {store_path})")
+        else:
+            summary, batches = load_store(store_path)
+            if not batches:
+                print(f"❌ No cohort store at {store_path}; run without --no-update first")
+                return 1
+        trends = cohort_trends(summary, granularity, by, neighbourhood, room_type)
+    except Exception as e:
+        print(f"❌ Error building cohort aggregates: {e}")
+        return 1
+    display_cohort_trends(trends, granularity)
+    if compare:
+        display_cohort_comparison(trends, *compare)
+    return 0
@@ -0,0 +1,215 @@
+# Price driver analysis engine for the Airbnb cleaned dataset
+#
+# Answers business question 1 of EDA.py ("What factors most significantly
+# influence property prices?") in one vectorized pass: numeric correlation
+# matrix, one-way ANOVA (F statistic and eta squared) for every categorical
+# column and mutual information (raw and adjusted for chance) for every
+# feature against each target.
+#
+# All per-group statistics come from np.bincount group-sum kernels over
+# integer category codes, so no one-hot matrix is ever built and the cost is
+# linear in rows regardless of how many categories a column has.
+
+import pandas as pd
+import numpy as np
+
+# Default columns used by the EDA workflow
+NUMERIC_COLS = ['Price', 'Review Scores Rating', 'Number Of Reviews', 'Number of Records', 'Beds']
+CATEGORICAL_COLS = ['Neighbourhood', 'Zipcode', 'Property Type', 'Room Type', 'Beds']
+TARGET_COLS = ['Price', 'Review Scores Rating']
+
+
+def encode_categories(series):
+    """Factorize a column to integer codes (missing values become -1)"""
+    codes, uniques = pd.factorize(series, sort=False)
+    return codes.astype(np.int64), uniques
+
+
+def group_sums(codes, n_groups, values):
+    """Per-group count, sum and sum of squares for several targets at once
+
+    values is an (n_rows, n_targets) array; NaN entries and rows with code -1
+    are ignored. A single flattened bincount per statistic covers all targets.
+    """
+    values = np.asarray(values, dtype=float)
+    n_targets = values.shape[1]
+    valid = (codes >= 0)[:, None] & ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    # Flattened index: group * n_targets + target
+    flat_index = (np.where(codes >= 0, codes, 0)[:, None] * n_targets + np.arange(n_targets)).ravel()
+    size = n_groups * n_targets
+    counts = np.bincount(flat_index, weights=valid.ravel().astype(float), minlength=size)
+    sums = np.bincount(flat_index, weights=filled.ravel(), minlength=size)
+    sumsq = np.bincount(flat_index, weights=(filled ** 2).ravel(), minlength=size)
+
+    shape = (n_groups, n_targets)
+    return counts.reshape(shape), sums.reshape(shape), sumsq.reshape(shape)
+
+
+def anova_from_sums(counts, sums, sumsq):
+    """One-way ANOVA statistics per target from group count/sum/sumsq arrays"""
+    n_total = counts.sum(axis=0)
+    grand_sum = sums.sum(axis=0)
+    occupied = counts > 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correction = np.where(n_total > 0, grand_sum ** 2 / n_total, 0.0)
+        ss_total = sumsq.sum(axis=0) - correction
+        group_term = np.where(occupied, sums ** 2 / np.where(occupied, counts, 1.0), 0.0).sum(axis=0)
+        ss_between = group_term - correction
+        ss_within = ss_total - ss_between
+
+        n_groups = occupied.sum(axis=0)
+        df_between = n_groups - 1
+        df_within = n_total - n_groups
+        f_stat = (ss_between / df_between) / (ss_within / df_within)
+        eta_squared = ss_between / ss_total
+
+    return pd.DataFrame({
+        'groups': n_groups,
+        'n': n_total.astype(int),
+        'F': np.where((df_between > 0) & (df_within > 0), f_stat, np.nan),
+        'eta_squared': np.where(ss_total > 0, eta_squared, np.nan),
+    })
+
+
+def quantile_bins(values, n_bins=10):
+    """Discretize a numeric array into quantile bins (missing values become -1)"""
+    values = np.asarray(values, dtype=float)
+    codes = np.full(values.shape[0], -1, dtype=np.int64)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return codes, 0
+    edges = np.unique(np.quantile(values[valid], np.linspace(0, 1, n_bins + 1)[1:-1]))
+    codes[valid] = np.searchsorted(edges, values[valid], side='right')
+    return codes, len(edges) + 1
+
+
+def mutual_information(x_codes, n_x, y_codes, n_y):
+    """Mutual information (nats) between two integer-coded variables"""
+    valid = (x_codes >= 0) & (y_codes >= 0)
+    if not valid.any():
+        return np.nan
+    joint = np.bincount(x_codes[valid] * n_y + y_codes[valid], minlength=n_x * n_y).reshape(n_x, n_y)
+    p_xy = joint / joint.sum()
+    p_x = p_xy.sum(axis=1, keepdims=True)
+    p_y = p_xy.sum(axis=0, keepdims=True)
+    nonzero = p_xy > 0
+    return float((p_xy[nonzero] * np.log(p_xy[nonzero] / (p_x @ p_y)[nonzero])).sum())
+
+
+def chance_mutual_information(x_codes, y_codes):
+    """Mutual information expected between independent variables with these levels (Miller-Madow bias)
+
+    Raw mutual information grows with the number of levels even when there is
+    no relationship, so high-cardinality features (e.g. Zipcode) are ranked on
+    their mutual information minus this term.
+    """
+    valid = (x_codes >= 0) & (y_codes >= 0)
+    if not valid.any():
+        return np.nan
+    k_x, k_y = len(np.unique(x_codes[valid])), len(np.unique(y_codes[valid]))
+    return (k_x - 1) * (k_y - 1) / (2 * valid.sum())
+
+
+def compute_price_drivers(df, categorical_cols=None, numeric_cols=None, target_cols=None, n_bins=10):
+    """Compute the full price-driver table for a cleaned Airbnb DataFrame
+
+    Returns a dictionary with:
+      - 'correlation': numeric correlation matrix
+      - 'anova': F statistic and eta squared per (feature, target)
+      - 'mutual_info': mutual information per feature (rows) and target (columns)
+      - 'mutual_info_adjusted': the same minus the value expected by chance
+      - 'summary': one row per feature ranked by its adjusted mutual
+        information with the first target
+    """
+    categorical_cols = [c for c in (categorical_cols or CATEGORICAL_COLS) if c in df.columns]
+    numeric_cols = [c for c in (numeric_cols or NUMERIC_COLS) if c in df.columns]
+    target_cols = [c for c in (target_cols or TARGET_COLS) if c in df.columns]
+
+    # Center targets before accumulating squares for numerical stability
+    targets = df[target_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    targets = targets - np.nanmean(targets, axis=0)
+
+    # Numeric correlation matrix (pairwise complete observations)
+    correlation = df[numeric_cols].apply(pd.to_numeric, errors='coerce').corr()
+
+    # Pre-bin every target once for mutual information
+    target_bins = [quantile_bins(targets[:, j], n_bins) for j in range(len(target_cols))]
+
+    anova_frames = []
+    mi_rows = {}
+    chance_rows = {}
+    for col in categorical_cols:
+        codes, uniques = encode_categories(df[col])
+        counts, sums, sumsq = group_sums(codes, len(uniques), targets)
+        table = anova_from_sums(counts, sums, sumsq)
+        table.insert(0, 'target', target_cols)
+        table.insert(0, 'feature', col)
+        anova_frames.append(table)
+        mi_rows[col] = [mutual_information(codes, len(uniques), y_codes, n_y) for y_codes, n_y in target_bins]
+        chance_rows[col] = [chance_mutual_information(codes, y_codes) for y_codes, _ in target_bins]
+
+    # Numeric features that are not already treated as categorical get binned
+    for col in numeric_cols:
+        if col in mi_rows:
+            continue
+        x_codes, n_x = quantile_bins(pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float), n_bins)
+        mi_rows[col] = [
+            np.nan if col == target else mutual_information(x_codes, n_x, y_codes, n_y)
+            for target, (y_codes, n_y) in zip(target_cols, target_bins)
+        ]
+        chance_rows[col] = [chance_mutual_information(x_codes, y_codes) for y_codes, _ in target_bins]
+
+    anova = pd.concat(anova_frames, ignore_index=True).set_index(['feature', 'target']) if anova_frames else pd.DataFrame()
+    mutual_info = pd.DataFrame.from_dict(mi_rows, orient='index', columns=target_cols)
+    chance = pd.DataFrame.from_dict(chance_rows, orient='index', columns=target_cols)
+    mutual_info_adjusted = (mutual_info - chance).clip(lower=0)
+
+    # Summary table focused on the first target (Price by default)
+    primary = target_cols[0]
+    summary = pd.DataFrame(index=mutual_info.index)
+    summary['kind'] = ['categorical' if c in categorical_cols else 'numeric' for c in summary.index]
+    if not anova.empty:
+        primary_anova = anova.xs(primary, level='target')
+        summary['groups'] = primary_anova['groups']
+        summary['F'] = primary_anova['F']
+        summary['eta_squared'] = primary_anova['eta_squared']
+    if primary in correlation.columns:
+        summary['correlation'] = correlation[primary].reindex(summary.index)
+        summary.loc[summary.index == primary, 'correlation'] = np.nan
+    summary['mutual_info'] = mutual_info[primary]
+    summary['mutual_info_adjusted'] = mutual_info_adjusted[primary]
+    summary = summary.drop(index=primary, errors='ignore').sort_values('mutual_info_adjusted', ascending=False)
+
+    return {
+        'correlation': correlation,
+        'anova': anova,
+        'mutual_info': mutual_info,
+        'mutual_info_adjusted': mutual_info_adjusted,
+        'summary': summary,
+    }
+
+
+def display_price_drivers(results, target='Price'):
+    """Display the price-driver table in a formatted way"""
+
+    print(f"\n=== PRICE DRIVER ANALYSIS ({target.upper()}) ===")
+    summary = results['summary']
+    for feature, row in summary.iterrows():
+        parts = [f"adjusted MI: {row['mutual_info_adjusted']:.3f} (raw {row['mutual_info']:.3f})"]
+        if 'eta_squared' in row and pd.notna(row.get('eta_squared')):
+            parts.append(f"eta²: {row['eta_squared']:.3f}")
+            parts.append(f"F: {row['F']:.1f} ({int(row['groups'])} groups)")
+        if 'correlation' in row and pd.notna(row.get('correlation')):
+            parts.append(f"r: {row['correlation']:+.3f}")
+        print(f"• {feature} ({row['kind']}): " + " | ".join(parts))
+
+    if not summary.empty:
+        print(f"• Strongest driver of {target.lower()}: {summary.index[0]}")
+
+    print("\n=== ANOVA BY CATEGORICAL VARIABLE ===")
+    print(results['anova'].round(4))
+    print("\n=== NUMERIC CORRELATION MATRIX ===")
+    print(results['correlation'].round(3))
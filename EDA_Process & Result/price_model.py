@@ -0,0 +1,275 @@
+# Streaming regression model of Price for the Airbnb cleaned dataset
+#
+# The model is fitted from the normal equations (X'X b = X'y), which are
+# accumulated chunk by chunk from the ETL output so the full dataset never has
+# to be in memory. Categorical features are never one-hot encoded: their blocks
+# of X'X and X'y are built directly from integer codes with np.bincount.
+# Accumulators from different partitions or days can be merged and saved, so
+# the model can be refreshed incrementally with new data only.
+
+import json
+
+import pandas as pd
+import numpy as np
+
+# Shared ETL helper: made importable by pipeline.import_stage (or EDA.py when run directly)
+from canonical import canonical_values
+
+# Default model specification
+CATEGORICAL_FEATURES = ['Neighbourhood', 'Room Type', 'Property Type', 'Beds']
+NUMERIC_FEATURES = ['Review Scores Rating', 'Number Of Reviews']
+TARGET = 'Price'
+INTERCEPT = '(Intercept)'
+
+
+class NormalEquations:
+    """Mergeable accumulator of X'X, X'y and y'y for a linear price model"""
+
+    def __init__(self, categorical=None, numeric=None, target=TARGET):
+        self.categorical = list(CATEGORICAL_FEATURES if categorical is None else categorical)
+        self.numeric = list(NUMERIC_FEATURES if numeric is None else numeric)
+        self.target = target
+        self.labels = [INTERCEPT] + self.numeric
+        self.xtx = np.zeros((len(self.labels), len(self.labels)))
+        self.xty = np.zeros(len(self.labels))
+        self.yty = 0.0
+        self.rows_used = 0
+        self.rows_skipped = 0
+
+    def _index_of(self, labels):
+        """Map labels to accumulator positions, growing the matrices for unseen levels"""
+        positions = {label: i for i, label in enumerate(self.labels)}
+        new_labels = [label for label in labels if label not in positions]
+        if new_labels:
+            for label in new_labels:
+                positions[label] = len(self.labels)
+                self.labels.append(label)
+            grow = len(new_labels)
+            self.xtx = np.pad(self.xtx, ((0, grow), (0, grow)))
+            self.xty = np.pad(self.xty, (0, grow))
+        return np.array([positions[label] for label in labels], dtype=np.int64)
+
+    def _add(self, labels, xtx, xty, yty, rows_used, rows_skipped):
+        """Scatter-add partial sums expressed over their own label order"""
+        index = self._index_of(labels)
+        self.xtx[np.ix_(index, index)] += xtx
+        self.xty[index] += xty
+        self.yty += yty
+        self.rows_used += rows_used
+        self.rows_skipped += rows_skipped
+
+    def update(self, chunk):
+        """Accumulate one batch of rows (a DataFrame) into the normal equations"""
+        columns = self.numeric + self.categorical + [self.target]
+        data = chunk[columns]
+        complete = data.notna().all(axis=1).to_numpy()
+        data = data[complete]
+        skipped = int((~complete).sum())
+        if data.empty:
+            self.rows_skipped += skipped
+            return self
+
+        y = pd.to_numeric(data[self.target], errors='coerce').to_numpy(dtype=float)
+        dense = np.column_stack([np.ones(len(data))] + [
+            pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=float) for col in self.numeric
+        ])
+        usable = ~np.isnan(y) & ~np.isnan(dense).any(axis=1)
+        skipped += int((~usable).sum())
+        y, dense, data = y[usable], dense[usable], data[usable]
+
+        # Integer codes per categorical feature (chunk-local vocabularies). Levels are
+        # canonicalized first so Beds=1 from an int chunk and Beds=1.0 from a float
+        # chunk get the same label and merge into one column
+        encoded = [pd.factorize(canonical_values(data[col]), sort=True) for col in self.categorical]
+        labels = [INTERCEPT] + self.numeric
+        offsets = []
+        for col, (_, uniques) in zip(self.categorical, encoded):
+            offsets.append(len(labels))
+            labels.extend(f"{col}={value}" for value in uniques)
+
+        n_dense = dense.shape[1]
+        size = len(labels)
+        xtx = np.zeros((size, size))
+        xty = np.zeros(size)
+
+        # Dense block
+        xtx[:n_dense, :n_dense] = dense.T @ dense
+        xty[:n_dense] = dense.T @ y
+
+        for a, ((codes_a, uniques_a), offset_a) in enumerate(zip(encoded, offsets)):
+            n_a = len(uniques_a)
+            block_a = slice(offset_a, offset_a + n_a)
+
+            # Categorical x dense block and categorical part of X'y
+            flat = (codes_a[:, None] * n_dense + np.arange(n_dense)).ravel()
+            cross = np.bincount(flat, weights=dense.ravel(), minlength=n_a * n_dense).reshape(n_a, n_dense)
+            xtx[block_a, :n_dense] = cross
+            xtx[:n_dense, block_a] = cross.T
+            xty[block_a] = np.bincount(codes_a, weights=y, minlength=n_a)
+
+            # Diagonal block: level counts
+            xtx[block_a, block_a] = np.diag(np.bincount(codes_a, minlength=n_a).astype(float))
+
+            # Categorical x categorical blocks: joint level counts
+            for (codes_b, uniques_b), offset_b in zip(encoded[a + 1:], offsets[a + 1:]):
+                n_b = len(uniques_b)
+                joint = np.bincount(codes_a * n_b + codes_b, minlength=n_a * n_b).reshape(n_a, n_b).astype(float)
+                block_b = slice(offset_b, offset_b + n_b)
+                xtx[block_a, block_b] = joint
+                xtx[block_b, block_a] = joint.T
+
+        self._add(labels, xtx, xty, float(y @ y), len(y), skipped)
+        return self
+
+    def merge(self, other):
+        """Merge another accumulator (e.g. another partition or day) into this one"""
+        if (other.categorical, other.numeric, other.target) != (self.categorical, self.numeric, self.target):
+            raise ValueError("Cannot merge accumulators with different model specifications")
+        self._add(other.labels, other.xtx, other.xty, other.yty, other.rows_used, other.rows_skipped)
+        return self
+
+    def save(self, path):
+        """Persist the accumulator to a .npz file (plain arrays only, no pickled objects)"""
+        spec = json.dumps({'categorical': self.categorical, 'numeric': self.numeric, 'target': self.target})
+        np.savez(path, labels=np.array(self.labels, dtype=str), xtx=self.xtx, xty=self.xty,
+                 totals=np.array([self.yty, self.rows_used, self.rows_skipped]), spec=np.array(spec))
+
+    @classmethod
+    def load(cls, path):
+        """Load an accumulator previously written with save()"""
+        stored = np.load(path, allow_pickle=False)
+        spec = json.loads(str(stored['spec']))
+        acc = cls(spec['categorical'], spec['numeric'], spec['target'])
+        acc.labels = [str(label) for label in stored['labels']]
+        acc.xtx = stored['xtx']
+        acc.xty = stored['xty']
+        acc.yty, rows_used, rows_skipped = stored['totals']
+        acc.rows_used, acc.rows_skipped = int(rows_used), int(rows_skipped)
+        return acc
+
+    def reference_levels(self):
+        """Most frequent level of each categorical feature (dropped as baseline)"""
+        counts = np.diag(self.xtx)
+        references = {}
+        for col in self.categorical:
+            prefix = f"{col}="
+            levels = [i for i, label in enumerate(self.labels) if label.startswith(prefix)]
+            if levels:
+                references[col] = self.labels[max(levels, key=lambda i: counts[i])]
+        return references
+
+    def fit(self, alpha=0.0):
+        """Solve the (ridge) normal equations and return coefficients and diagnostics
+
+        alpha is the ridge penalty applied to every coefficient except the
+        intercept; alpha=0 gives ordinary least squares.
+        """
+        if self.rows_used == 0:
+            raise ValueError("No rows accumulated; cannot fit the price model")
+
+        references = self.reference_levels()
+        keep = np.array([label not in references.values() for label in self.labels])
+        labels = [label for label, k in zip(self.labels, keep) if k]
+        a = self.xtx[np.ix_(keep, keep)]
+        c = self.xty[keep]
+
+        penalty = np.full(len(labels), float(alpha))
+        penalty[0] = 0.0
+        a_reg = a + np.diag(penalty)
+        try:
+            beta = np.linalg.solve(a_reg, c)
+        except np.linalg.LinAlgError:
+            beta = np.linalg.lstsq(a_reg, c, rcond=None)[0]
+
+        n = self.rows_used
+        p = len(labels)
+        sse = float(self.yty - 2 * beta @ c + beta @ a @ beta)
+        sst = float(self.yty - self.xty[0] ** 2 / n)
+        dof = n - p
+        sigma2 = sse / dof if dof > 0 else np.nan
+
+        coefficients = pd.DataFrame({'coefficient': beta}, index=pd.Index(labels, name='term'))
+        if alpha == 0 and dof > 0:
+            inverse = np.linalg.pinv(a)
+            coefficients['std_error'] = np.sqrt(np.clip(np.diag(inverse) * sigma2, 0, None))
+            coefficients['t_stat'] = coefficients['coefficient'] / coefficients['std_error']
+
+        diagnostics = {
+            'rows_used': n,
+            'rows_skipped': self.rows_skipped,
+            'n_parameters': p,
+            'alpha': alpha,
+            'sse': sse,
+            'rmse': np.sqrt(max(sse, 0.0) / n),
+            'r_squared': 1 - sse / sst if sst > 0 else np.nan,
+            'adj_r_squared': 1 - (sse / dof) / (sst / (n - 1)) if sst > 0 and dof > 0 else np.nan,
+            'reference_levels': references,
+        }
+        return {'coefficients': coefficients, 'diagnostics': diagnostics}
+
+
+def iter_chunks(source, chunksize=50_000):
+    """Yield DataFrame batches from a CSV path, a DataFrame or an iterable of DataFrames"""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif isinstance(source, str):
+        yield from pd.read_csv(source, chunksize=chunksize)
+    else:
+        yield from source
+
+
+def accumulate(source, chunksize=50_000, categorical=None, numeric=None, target=TARGET):
+    """Build a NormalEquations accumulator from a streamed data source"""
+    acc = NormalEquations(categorical, numeric, target)
+    for chunk in iter_chunks(source, chunksize):
+        acc.update(chunk)
+    return acc
+
+
+def fit_price_model(source, alpha=0.0, chunksize=50_000, categorical=None, numeric=None, target=TARGET):
+    """Fit the price model over a CSV path or DataFrame without loading it all at once"""
+    return accumulate(source, chunksize, categorical, numeric, target).fit(alpha)
+
+
+def predict(model, df):
+    """Predict prices for a DataFrame using a fitted model (unseen levels count as baseline)"""
+    coefficients = model['coefficients']['coefficient']
+    prediction = np.full(len(df), coefficients.get(INTERCEPT, 0.0))
+    for label, value in coefficients.items():
+        if label == INTERCEPT:
+            continue
+        if '=' in label:
+            col, level = label.split('=', 1)
+            if col in df.columns:
+                prediction += np.where(canonical_values(df[col]) == level, value, 0.0)
+        elif label in df.columns:
+            prediction += value * pd.to_numeric(df[label], errors='coerce').to_numpy(dtype=float)
+    return pd.Series(prediction, index=df.index, name=f"Predicted {TARGET}")
+
+
+def display_price_model(model, top_n=5):
+    """Display model-adjusted premiums and fit diagnostics"""
+    coefficients = model['coefficients']['coefficient']
+    diagnostics = model['diagnostics']
+
+    print("\n=== PRICE MODEL (MODEL-ADJUSTED PREMIUMS) ===")
+    print(f"• Fitted on {diagnostics['rows_used']:,} listings ({diagnostics['rows_skipped']:,} skipped), "
+          f"{diagnostics['n_parameters']} parameters")
+    if diagnostics['rows_used'] <= diagnostics['n_parameters']:
+        print("• Degenerate fit: no more listings than parameters, so premiums cannot be estimated; section skipped")
+        return
+    print(f"• R²: {diagnostics['r_squared']:.3f} | Adjusted R²: {diagnostics['adj_r_squared']:.3f} | RMSE: ${diagnostics['rmse']:.2f}")
+
+    for col, reference in diagnostics['reference_levels'].items():
+        prefix = f"{col}="
+        effects = coefficients[coefficients.index.str.startswith(prefix)].sort_values(ascending=False)
+        if effects.empty:
+            continue
+        baseline = reference[len(prefix):]
+        print(f"• {col} premiums vs. {baseline} (holding other factors constant):")
+        for label, value in effects.head(top_n).items():
+            print(f"  - {label[len(prefix):]}: {value:+.0f}$/night")
+
+    for col in [label for label in coefficients.index if label != INTERCEPT and '=' not in label]:
+        print(f"• {col}: {coefficients[col]:+.2f}$/night per unit")
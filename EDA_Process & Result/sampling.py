@@ -0,0 +1,253 @@
+# Stratified sampling for fast approximate EDA with error estimates
+#
+# One streaming pass over the cleaned data draws a stratified sample by
+# Neighbourhood x Room Type. Every row gets a uniform random key: rows whose
+# key is at most the sampling fraction are kept (a Bernoulli sample of each
+# stratum), and the rows with the smallest keys are also kept per stratum so
+# that small strata can be topped up to a minimum size. Either way each stratum
+# sample is a simple random sample of that stratum, so population counts per
+# stratum are enough to weight the sample back to the full data and to give
+# margins of error for means and shares. Samples are persisted next to their
+# stratum counts and reused while the source data is unchanged.
+
+import hashlib
+import json
+import os
+from statistics import NormalDist
+
+import pandas as pd
+import numpy as np
+
+DEFAULT_SAMPLE_DIR = os.path.join('.cache', 'samples')
+STRATA_COLS = ['Neighbourhood', 'Room Type']
+DEFAULT_FRACTION = 0.1
+DEFAULT_MIN_PER_STRATUM = 30
+DEFAULT_ROWS_PER_SECOND = 2_000  # full-EDA throughput assumed until a run has been timed
+THROUGHPUT_FILE = 'throughput.json'
+KEY_COL = '_sample_key'
+ROW_COL = '_source_row'
+
+
+def _keep_smallest(frame, strata_cols, size):
+    """Keep the size rows with the smallest keys in each stratum"""
+    return frame.sort_values(KEY_COL, kind='stable').groupby(strata_cols, dropna=False, sort=False).head(size)
+
+
+def stratified_sample(chunks, strata_cols=None, fraction=DEFAULT_FRACTION,
+                      min_per_stratum=DEFAULT_MIN_PER_STRATUM, seed=None):
+    """Draw a stratified random sample in one pass over an iterable of DataFrames
+
+    Each stratum gets max(min_per_stratum, ~fraction of its rows) rows, or all
+    of them when it is smaller. Returns (sample, strata) where strata holds the
+    population and sample row counts of every stratum.
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError("fraction must be in (0, 1]")
+    strata_cols = list(STRATA_COLS if strata_cols is None else strata_cols)
+    rng = np.random.default_rng(seed)
+
+    selected = []  # rows with key <= fraction
+    reserve = None  # per stratum, the min_per_stratum smallest keys among the other rows
+    population = None
+    offset = 0
+    for chunk in chunks:
+        chunk = chunk.copy()
+        chunk[ROW_COL] = np.arange(offset, offset + len(chunk))
+        chunk[KEY_COL] = rng.random(len(chunk))
+        offset += len(chunk)
+
+        counts = chunk.groupby(strata_cols, dropna=False, observed=True).size()
+        population = counts if population is None else population.add(counts, fill_value=0)
+
+        inside = chunk[KEY_COL].to_numpy() <= fraction
+        selected.append(chunk[inside])
+        if min_per_stratum:
+            rest = chunk[~inside] if reserve is None else pd.concat([reserve, chunk[~inside]])
+            reserve = _keep_smallest(rest, strata_cols, min_per_stratum)
+
+    if population is None:
+        raise ValueError("No rows to sample")
+
+    sample = pd.concat(selected)
+    if min_per_stratum and reserve is not None and len(reserve):
+        # Top up strata whose Bernoulli sample fell short with their next-smallest keys
+        sample = pd.concat([sample, reserve]).sort_values(KEY_COL, kind='stable')
+        in_fraction = sample[KEY_COL].to_numpy() <= fraction
+        ranks = sample.groupby(strata_cols, dropna=False, sort=False).cumcount().to_numpy()
+        sample = sample[in_fraction | (ranks < min_per_stratum)]
+    sample = sample.sort_values(ROW_COL).drop(columns=[KEY_COL, ROW_COL]).reset_index(drop=True)
+
+    strata = population.astype(int).rename('population').to_frame()
+    strata['sample'] = sample.groupby(strata_cols, dropna=False, observed=True).size()
+    strata['sample'] = strata['sample'].fillna(0).astype(int)
+    return sample, strata.reset_index()
+
+
+def estimate_rows(source, probe_rows=1_000):
+    """Estimate the row count of a CSV from its size and the width of its first rows"""
+    head = pd.read_csv(source, nrows=probe_rows)
+    if len(head) < probe_rows:
+        return len(head)
+    with open(source, 'rb') as f:
+        probe_bytes = sum(len(f.readline()) for _ in range(probe_rows + 1))
+    return int(os.path.getsize(source) / probe_bytes * (probe_rows + 1))
+
+
+def load_throughput(sample_dir=DEFAULT_SAMPLE_DIR):
+    """Rows per second measured by the last timed EDA run (default if never timed)"""
+    path = os.path.join(sample_dir, THROUGHPUT_FILE)
+    if not os.path.exists(path):
+        return DEFAULT_ROWS_PER_SECOND
+    with open(path) as f:
+        return json.load(f)['rows_per_second']
+
+
+def record_throughput(rows, seconds, sample_dir=DEFAULT_SAMPLE_DIR):
+    """Remember how many rows per second the EDA processed, for later time budgets"""
+    if seconds <= 0 or rows <= 0:
+        return
+    os.makedirs(sample_dir, exist_ok=True)
+    with open(os.path.join(sample_dir, THROUGHPUT_FILE), 'w') as f:
+        json.dump({'rows_per_second': rows / seconds, 'rows': rows, 'seconds': seconds}, f)
+
+
+def fraction_for_budget(total_rows, budget_seconds, rows_per_second=DEFAULT_ROWS_PER_SECOND):
+    """Sampling fraction expected to finish the EDA within budget_seconds"""
+    if total_rows <= 0:
+        return 1.0
+    return float(min(1.0, max(budget_seconds * rows_per_second / total_rows, 1 / total_rows)))
+
+
+def _sample_paths(sample_dir, source_fingerprint, params):
+    payload = json.dumps([source_fingerprint, params], sort_keys=True, default=str)
+    key = hashlib.sha256(payload.encode()).hexdigest()[:16]
+    base = os.path.join(sample_dir, f"sample-{key}")
+    return f"{base}.csv", f"{base}.json"
+
+
+def load_or_build_sample(source, source_fingerprint, chunks, fraction=DEFAULT_FRACTION,
+                         min_per_stratum=DEFAULT_MIN_PER_STRATUM, strata_cols=None, seed=42,
+                         filters=None, sample_dir=DEFAULT_SAMPLE_DIR):
+    """Return (sample path, metadata), reusing a persisted sample of the same data and settings
+
+    chunks is a zero-argument callable returning the batches to stream; it is
+    only called when no stored sample matches.
+    """
+    strata_cols = list(STRATA_COLS if strata_cols is None else strata_cols)
+    params = {'fraction': round(fraction, 6), 'min_per_stratum': min_per_stratum,
+              'strata_cols': strata_cols, 'seed': seed, 'filters': filters or []}
+    sample_path, meta_path = _sample_paths(sample_dir, source_fingerprint, params)
+    if os.path.exists(sample_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        meta['reused'] = True
+        return sample_path, meta
+
+    sample, strata = stratified_sample(chunks(), strata_cols, fraction, min_per_stratum, seed)
+    os.makedirs(sample_dir, exist_ok=True)
+    sample.to_csv(sample_path, index=False)
+    meta = dict(params, source=source, sample_rows=int(len(sample)),
+                population_rows=int(strata['population'].sum()),
+                strata=json.loads(strata.to_json(orient='records')))
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    meta['reused'] = False
+    return sample_path, meta
+
+
+def _z_value(confidence):
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def _strata_frame(meta):
+    """Stratum population counts stored in the sample metadata"""
+    strata = pd.DataFrame(meta['strata'])
+    return strata[meta['strata_cols'] + ['population']]
+
+
+def stratified_means(sample, strata, value_cols, by=None, confidence=0.95):
+    """Weighted means of value_cols with margins of error, overall or per domain
+
+    strata has the strata columns and each stratum's population count; by
+    (optional) must be a subset of the strata columns. Returns one row per
+    domain with estimate, margin and sample count columns for every value.
+    """
+    strata_cols = [col for col in strata.columns if col != 'population']
+    by = [] if by is None else ([by] if isinstance(by, str) else list(by))
+    if not set(by) <= set(strata_cols):
+        raise ValueError(f"Domains must be built from the strata columns {strata_cols}")
+    value_cols = [value_cols] if isinstance(value_cols, str) else list(value_cols)
+    z = _z_value(confidence)
+
+    keys = sample[strata_cols].astype(str)
+    populations = strata.assign(**{col: strata[col].astype(str) for col in strata_cols}) \
+        .set_index(strata_cols)['population']
+    results = {}
+    for column in value_cols:
+        values = pd.to_numeric(sample[column], errors='coerce')
+        grouped = values.groupby([keys[col] for col in strata_cols], dropna=False)
+        moments = pd.DataFrame({'n': grouped.count(), 'mean': grouped.mean(), 'var': grouped.var(ddof=1)})
+        moments = moments[moments['n'] > 0].join(populations, how='left')
+        moments['var'] = moments['var'].fillna(0.0)
+        moments['fpc'] = (1 - moments['n'] / moments['population']).clip(lower=0)
+        moments['weighted_mean'] = moments['population'] * moments['mean']
+        moments['weighted_var'] = moments['population'] ** 2 * moments['fpc'] * moments['var'] / moments['n']
+
+        domain = moments.groupby(level=by) if by else moments.groupby(lambda _: 'All')
+        totals = domain[['population', 'weighted_mean', 'weighted_var', 'n']].sum()
+        results[f"{column}"] = totals['weighted_mean'] / totals['population']
+        results[f"{column}_margin"] = z * np.sqrt(totals['weighted_var']) / totals['population']
+        results[f"{column}_n"] = totals['n'].astype(int)
+    return pd.DataFrame(results)
+
+
+def stratified_shares(sample, strata, column, by=None, confidence=0.95):
+    """Weighted share of each value of column (as a percentage) with margins of error"""
+    indicators = pd.get_dummies(sample[column].astype(str), dtype=float)
+    indicators[sample[column].isna().to_numpy()] = np.nan
+    data = pd.concat([sample[[col for col in strata.columns if col != 'population']], indicators], axis=1)
+    means = stratified_means(data, strata, list(indicators.columns), by, confidence)
+    shares = pd.DataFrame({
+        'share': means[list(indicators.columns)].stack() * 100,
+        'margin': means[[f"{value}_margin" for value in indicators.columns]].stack().to_numpy() * 100,
+    })
+    return shares
+
+
+def display_sample_summary(meta):
+    """Describe the sample the approximate EDA is running on"""
+    status = 'reused persisted sample' if meta.get('reused') else 'built new sample'
+    share = meta['sample_rows'] / meta['population_rows'] * 100 if meta['population_rows'] else 0
+    raised = sum(1 for stratum in meta['strata']
+                 if min(meta['min_per_stratum'], stratum['population']) > meta['fraction'] * stratum['population'])
+    print(f"\n🎯 APPROXIMATE MODE ({status}): {meta['sample_rows']:,} of {meta['population_rows']:,} rows "
+          f"({share:.1f}%), fraction {meta['fraction']:.3f}, {len(meta['strata'])} strata by "
+          f"{' × '.join(meta['strata_cols'])}")
+    if raised:
+        print(f"  • {raised} small strata raised to at least {meta['min_per_stratum']} rows; "
+              "unweighted charts over-represent them, the estimates below are weighted")
+
+
+def display_sample_estimates(sample, meta, confidence=0.95):
+    """Display population estimates from the sample with margins of error"""
+    strata = _strata_frame(meta)
+    print(f"\n📏 SAMPLE ESTIMATES WITH MARGINS OF ERROR ({confidence:.0%} confidence)")
+    print("=" * 60)
+
+    overall = stratified_means(sample, strata, ['Price', 'Review Scores Rating'], confidence=confidence).iloc[0]
+    print(f"  • Average price: ${overall['Price']:.2f} ± ${overall['Price_margin']:.2f}")
+    print(f"  • Average rating: {overall['Review Scores Rating']:.1f} ± {overall['Review Scores Rating_margin']:.1f}")
+
+    for column in meta['strata_cols']:
+        print(f"\n  Average price by {column}:")
+        means = stratified_means(sample, strata, 'Price', by=column, confidence=confidence)
+        for value, row in means.sort_values('Price', ascending=False).iterrows():
+            print(f"    {value}: ${row['Price']:.2f} ± ${row['Price_margin']:.2f} (n={int(row['Price_n'])})")
+
+    for column in meta['strata_cols'] + ['Property Type']:
+        if column not in sample.columns:
+            continue
+        print(f"\n  Share of listings by {column}:")
+        shares = stratified_shares(sample, strata, column, confidence=confidence).loc['All']
+        for value, row in shares.sort_values('share', ascending=False).head(10).iterrows():
+            print(f"    {value}: {row['share']:.1f}% ± {row['margin']:.1f}%")
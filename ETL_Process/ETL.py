@@ -1,97 +1,175 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+from validation import REQUIRED_COLUMNS, validate, display_validation_report
+from csv_writer import DEFAULT_WORKERS as DEFAULT_WRITE_WORKERS, write_csv
+from outliers import compute_bounds, apply_bounds, display_outlier_report
+from partitions import DEFAULT_PARTITION_COLS, write_partitioned, display_partition_summary
+from categories import DEFAULT_REGISTRY, CATEGORICAL_COLUMNS, load_registry, save_registry, encode_columns, display_unknown_values
+
+# Default input/output locations (relative to the repository root)
+DEFAULT_INPUT = os.path.join("Datasource", "airbnb.xlsx")
+DEFAULT_OUTPUT = os.path.join("Datasource", "airbnb_clean.csv")
+
+
+def load_raw_dataset(input_path=DEFAULT_INPUT):
+    """Read the raw Airbnb dataset and print an overview (returns None on failure)"""
+    #Read the Airbnb dataset
+    try:
+        Airbnb_df = pd.read_excel(input_path)
+        print(f"{'='*5} Retrieve original dataset successfully {'='*5}")
+    except Exception as e:
+        print(f"Error reading dataset: {str(e)}")
+        print(f"Please check if the '{os.path.dirname(input_path) or '.'}' directory exists and you have read permissions.")
+        return None
+
+    # Display the shape of the dataset
+    print(f"Dataset Overview: {Airbnb_df.shape[0]:,} x {Airbnb_df.shape[1]}")
+
+    # Print all column names
+    print("\nAll Column Names:")
+    for i, col in enumerate(Airbnb_df.columns, 1):
+        print(f"{i:2d}. {col}")
+
+    Airbnb_df = Airbnb_df.sort_values(by='Host Id', ascending=True)
+
+    print(f"Reviews per Price: {Airbnb_df['Price'].describe()}")
+    print(Airbnb_df.head(10))
+    return Airbnb_df
+
+
+def clean_dataset(Airbnb_df, registry=None, on_unknown='append'):
+    """Apply the cleaning rules and return the cleaned dataset
+
+    Categorical columns are encoded with the stable codes of the category
+    registry ({column: [values]}); see categories.encode_column for on_unknown.
+    """
+    ##Clean Dataset
+    print(f"{'='*5} Clean Dataset {'='*5}")
+
+    # Remove leading and trailing spaces from column names
+    for col in Airbnb_df.columns:
+        clean_col = col.strip()
+        if col != clean_col:
+            Airbnb_df.rename(columns={col: clean_col}, inplace=True)
+
+    # Count the raw rows violating each cleaning rule before applying the rules
+    display_validation_report(validate(Airbnb_df))
+
+    #Remove duplicate rows based on 'Host Id' and 'Host Since'
+    Airbnb_df = Airbnb_df.drop_duplicates(subset=['Host Id', 'Host Since'])
+
+    # Reset "Host Since" column to datetime format and convert to date only
+    Airbnb_df["Host Since"] = pd.to_datetime(Airbnb_df["Host Since"], format= "%d/%m/%Y").dt.date
+
+    #Delete "Review Scores Rating (bin)" column
+    Airbnb_df = Airbnb_df.drop(columns=['Review Scores Rating (bin)'])
+
+    #Ensure numeric columns are in the correct format
+    Airbnb_df['Price'] = pd.to_numeric(Airbnb_df['Price'], errors='coerce')
+    Airbnb_df['Number of Records'] = pd.to_numeric(Airbnb_df['Number of Records'], errors='coerce')
+    Airbnb_df['Number Of Reviews'] = pd.to_numeric(Airbnb_df['Number Of Reviews'], errors='coerce')
+    Airbnb_df['Review Scores Rating'] = pd.to_numeric(Airbnb_df['Review Scores Rating'], errors='coerce')
+
+    # Fill empty/NaN values with consistent value for specific columns
+    # More sophisticated approach "def hierarchical_price_imputation"
+    Airbnb_df['Price'] = Airbnb_df['Price'].fillna(Airbnb_df.groupby('Zipcode')['Price'].transform('median'))
+    Airbnb_df['Price'] = Airbnb_df['Price'].fillna(Airbnb_df.groupby('Neighbourhood')['Price'].transform('median'))
+    Airbnb_df = Airbnb_df.dropna(subset=['Price'])
+
+    #Check rating values between 0 and 100
+    # Option 1: Clip outliers (keeps all rows, fixes bad values)
+    # Airbnb_df['Review Scores Rating'] = Airbnb_df['Review Scores Rating'].clip(lower=0, upper=100)
+
+    # Option 2: Remove outliers (removes rows with bad values) - REDUNDANT with clip
+    Airbnb_df = Airbnb_df[(Airbnb_df['Review Scores Rating'] >= 1) & (Airbnb_df['Review Scores Rating'] <= 100)]
+
+    # Remove rows with no records
+    Airbnb_df = Airbnb_df[(Airbnb_df['Number of Records'] >= 1)]
+
+    # Cleaning the dataset
+    Airbnb_df = Airbnb_df.dropna(subset=REQUIRED_COLUMNS)
+
+    #Catelog Neighbourhood, Room type, Beds and Property Type with stable codes from the category registry
+    registry = {} if registry is None else registry
+    Airbnb_df, new_values = encode_columns(Airbnb_df, registry, CATEGORICAL_COLUMNS, on_unknown)
+    display_unknown_values(new_values, on_unknown)
+
+    ## Reorder columns for better readability
+    Airbnb_df = Airbnb_df[REQUIRED_COLUMNS]
+
+    print(f"\n {'=' *5} Result after clean data {'=' *5}")
+    print(f"Cleaned dataset shape: {Airbnb_df.shape[0]:,} rows × {Airbnb_df.shape[1]} columns")
+    print(f"Data shape after cleaning: {Airbnb_df.shape}")
+    print(f"Missing values: {Airbnb_df.isnull().sum().sum()}")
+    print(Airbnb_df.head(10))
+    print(f"Empty prices after imputation: {Airbnb_df['Price'].isnull().sum()}")
+    return Airbnb_df
+
+
+def treat_outliers(Airbnb_df, action='flag', method='iqr'):
+    """Flag or winsorize Price and rating outliers against per Neighbourhood x Room Type bounds"""
+    print(f"{'='*5} Outliers: {action} ({method.upper()} by Neighbourhood x Room Type) {'='*5}")
+    bounds = compute_bounds(Airbnb_df, method=method)
+    Airbnb_df, counts = apply_bounds(Airbnb_df, bounds, action)
+    display_outlier_report(bounds, counts, method)
+    return Airbnb_df
+
+
+def save_clean_dataset(Airbnb_df, output_path=DEFAULT_OUTPUT, workers=DEFAULT_WRITE_WORKERS):
+    """Save the cleaned dataset with error handling (returns True on success)
+
+    With workers > 1, row blocks of a large frame are formatted by that many
+    processes; a .gz or .zst output path is compressed while it is written.
+    """
+    try:
+        write_csv(Airbnb_df, output_path, workers)
+        print(f"✅ Dataset saved successfully to: {output_path}")
+        print(f"📊 Cleaned dataset: {Airbnb_df.shape[0]:,} rows × {Airbnb_df.shape[1]} columns")
+        return True
+    except Exception as e:
+        print(f"❌ Error saving dataset: {str(e)}")
+        print(f"⚠️  Please check if the '{os.path.dirname(output_path) or '.'}' directory exists and you have write permissions.")
+        return False
+
+
+def save_partitioned_dataset(Airbnb_df, partition_dir, partition_cols=None):
+    """Save the cleaned dataset as Hive-style partitions with a manifest (returns True on success)"""
+    try:
+        manifest = write_partitioned(Airbnb_df, partition_dir, partition_cols or DEFAULT_PARTITION_COLS)
+        print(f"✅ Partitioned dataset saved successfully to: {partition_dir}")
+        display_partition_summary(manifest)
+        return True
+    except Exception as e:
+        print(f"❌ Error saving partitioned dataset: {str(e)}")
+        return False
+
+
+def main(input_path=DEFAULT_INPUT, output_path=DEFAULT_OUTPUT, partition_dir=None, partition_cols=None,
+         registry_path=DEFAULT_REGISTRY, write_workers=DEFAULT_WRITE_WORKERS, outliers=None, outlier_method='iqr'):
+    """Run the full ETL: read, clean and save (returns a process exit code)
+
+    When partition_dir is given the cleaned data is also written there,
+    partitioned by partition_cols (default: Neighbourhood, then Room Type).
+    New category values are appended to the registry at registry_path.
+    outliers ('flag' or 'winsorize') adds the group-wise outlier step with
+    outlier_method ('iqr' or 'mad').
+    """
+    Airbnb_df = load_raw_dataset(input_path)
+    if Airbnb_df is None:
+        return 1
+    registry = load_registry(registry_path)
+    Airbnb_df = clean_dataset(Airbnb_df, registry)
+    if outliers:
+        Airbnb_df = treat_outliers(Airbnb_df, outliers, outlier_method)
+    saved = save_clean_dataset(Airbnb_df, output_path, write_workers)
+    if partition_dir:
+        saved = save_partitioned_dataset(Airbnb_df, partition_dir, partition_cols) and saved
+    if saved:
+        save_registry(registry, registry_path)
+    return 0 if saved else 1
 
-#Read the Airbnb dataset
-try:
-    Airbnb_df = pd.read_excel(os.path.join("Datasource", "airbnb.xlsx"))
-    print(f"{'='*5} Retrieve original dataset successfully {'='*5}")
-except Exception as e:
-    print(f"Error reading dataset: {str(e)}")
-    print(f"Please check if the 'Datasource' directory exists and you have read permissions.")
-    exit(1)
-
-# Display the shape of the dataset
-print(f"Dataset Overview: {Airbnb_df.shape[0]:,} x {Airbnb_df.shape[1]}")
-
-# Print all column names
-print("\nAll Column Names:")
-for i, col in enumerate(Airbnb_df.columns, 1):
-    print(f"{i:2d}. {col}")
-
-Airbnb_df = Airbnb_df.sort_values(by='Host Id', ascending=True)
-
-print(f"Reviews per Price: {Airbnb_df['Price'].describe()}")
-print(Airbnb_df.head(10))
-
-##Clean Dataset
-print(f"{'='*5} Clean Dataset {'='*5}")
-
-# Remove leading and trailing spaces from column names
-for col in Airbnb_df.columns:
-    clean_col = col.strip()
-    if col != clean_col:
-        Airbnb_df.rename(columns={col: clean_col}, inplace=True)
-
-#Remove duplicate rows based on 'Host Id' and 'Host Since'
-Airbnb_df = Airbnb_df.drop_duplicates(subset=['Host Id', 'Host Since'])
-
-# Reset "Host Since" column to datetime format and convert to date only
-Airbnb_df["Host Since"] = pd.to_datetime(Airbnb_df["Host Since"], format= "%d/%m/%Y").dt.date
-
-#Delete "Review Scores Rating (bin)" column
-Airbnb_df = Airbnb_df.drop(columns=['Review Scores Rating (bin)'])
-
-#Ensure numeric columns are in the correct format
-Airbnb_df['Price'] = pd.to_numeric(Airbnb_df['Price'], errors='coerce')
-Airbnb_df['Number of Records'] = pd.to_numeric(Airbnb_df['Number of Records'], errors='coerce')
-Airbnb_df['Number Of Reviews'] = pd.to_numeric(Airbnb_df['Number Of Reviews'], errors='coerce')
-Airbnb_df['Review Scores Rating'] = pd.to_numeric(Airbnb_df['Review Scores Rating'], errors='coerce')
-
-# Fill empty/NaN values with consistent value for specific columns
-# More sophisticated approach "def hierarchical_price_imputation"
-Airbnb_df['Price'] = Airbnb_df['Price'].fillna(Airbnb_df.groupby('Zipcode')['Price'].transform('median'))
-Airbnb_df['Price'] = Airbnb_df['Price'].fillna(Airbnb_df.groupby('Neighbourhood')['Price'].transform('median'))
-Airbnb_df = Airbnb_df.dropna(subset=['Price'])
-
-#Check rating values between 0 and 100
-# Option 1: Clip outliers (keeps all rows, fixes bad values)
-# Airbnb_df['Review Scores Rating'] = Airbnb_df['Review Scores Rating'].clip(lower=0, upper=100)
-
-# Option 2: Remove outliers (removes rows with bad values) - REDUNDANT with clip
-Airbnb_df = Airbnb_df[(Airbnb_df['Review Scores Rating'] >= 1) & (Airbnb_df['Review Scores Rating'] <= 100)]
-
-# Remove rows with no records
-Airbnb_df = Airbnb_df[(Airbnb_df['Number of Records'] >= 1)]
-
-# Cleaning the dataset
-Airbnb_df = Airbnb_df.dropna(subset=['Host Id', 'Host Since', 'Neighbourhood', 'Zipcode','Property Type', 'Room Type', 'Beds', 'Price','Number of Records', 'Number Of Reviews', 'Review Scores Rating'])
-
-#Catelog Neighbourhood, Room type, Beds and Property Type
-Airbnb_df['Neighbourhood'] = Airbnb_df['Neighbourhood'].astype('category')
-Airbnb_df['Room Type'] = Airbnb_df['Room Type'].astype('category')
-Airbnb_df['Beds'] = Airbnb_df['Beds'].astype('category')
-Airbnb_df['Property Type'] = Airbnb_df['Property Type'].astype('category')
-
-## Reorder columns for better readability
-Airbnb_df = Airbnb_df[['Host Id', 'Host Since', 'Neighbourhood', 'Zipcode', 'Property Type', 'Room Type', 'Beds', 'Price', 'Number of Records', 'Number Of Reviews', 'Review Scores Rating']]
-
-print(f"\n {"=" *5} Result after clean data {"=" *5}")
-print(f"Cleaned dataset shape: {Airbnb_df.shape[0]:,} rows × {Airbnb_df.shape[1]} columns")
-print(f"Data shape after cleaning: {Airbnb_df.shape}")
-print(f"Missing values: {Airbnb_df.isnull().sum().sum()}")
-print(Airbnb_df.head(10))
-print(f"Empty prices after imputation: {Airbnb_df['Price'].isnull().sum()}")
-
-# Save the cleaned dataset with error handling
-try:
-    output_path = os.path.join("Datasource", "airbnb_clean.csv")
-    Airbnb_df.to_csv(output_path, index=False)
-    print(f"✅ Dataset saved successfully to: {output_path}")
-    print(f"📊 Cleaned dataset: {Airbnb_df.shape[0]:,} rows × {Airbnb_df.shape[1]} columns")
-except Exception as e:
-    print(f"❌ Error saving dataset: {str(e)}")
-    print(f"⚠️  Please check if the 'Datasource' directory exists and you have write permissions.")
 
 #region advanced price imputation
 # Hierarchical price imputation using median values
@@ -149,3 +227,6 @@ except Exception as e:
 # Airbnb_df = hierarchical_price_imputation(Airbnb_df)
 #endregion advanced price imputation
 
+
+if __name__ == "__main__":
+    sys.exit(main())
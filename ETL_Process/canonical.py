@@ -0,0 +1,42 @@
+# Canonical text form of column values, shared by the dataset diff, the price
+# model and the cohort store
+#
+# The same value can arrive typed differently depending on where it was read
+# from: Beds is 1 in one CSV chunk and 1.0 in another that happens to contain
+# a missing value, and dates are strings, datetimes or Excel timestamps.
+# canonical_values maps each of them to one text form (plain numbers, ISO
+# dates, None for missing) so values can be compared, hashed or used as labels.
+
+import pandas as pd
+import numpy as np
+
+
+def canonical_values(series, date_formats=None):
+    """Canonical text of each value: plain numbers (1.0 -> '1'), ISO dates for dates, None for missing"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text = series.dt.strftime('%Y-%m-%d').to_numpy(dtype=object)
+    elif date_formats:
+        text = series.astype(str).to_numpy(dtype=object)
+        unparsed = ~missing
+        for date_format in date_formats:
+            if not unparsed.any():
+                break
+            parsed = pd.to_datetime(series[unparsed], format=date_format, errors='coerce')
+            ok = parsed.notna().to_numpy()
+            rows = np.flatnonzero(unparsed)[ok]
+            text[rows] = parsed[ok].dt.strftime('%Y-%m-%d').to_numpy(dtype=object)
+            unparsed[rows] = False
+    else:
+        numeric = pd.to_numeric(series, errors='coerce') if not pd.api.types.is_numeric_dtype(series) else series
+        is_number = numeric.notna().to_numpy()
+        text = series.astype(str).to_numpy(dtype=object)
+        values = numeric[is_number].to_numpy(dtype=float)
+        integral = np.isfinite(values) & (values == np.round(values)) & (np.abs(values) < 2**53)
+        formatted = values.astype(str).astype(object)
+        formatted[integral] = values[integral].astype(np.int64).astype(str)
+        text[is_number] = formatted
+    text[missing] = None
+    return text
@@ -0,0 +1,111 @@
+# Persisted category dictionaries shared across ETL runs, partitions and the EDA
+#
+# Each categorical column has an append-only list of values stored in a JSON
+# registry; a value's position in that list is its integer code and never
+# changes. Columns are encoded straight to pandas Categoricals whose categories
+# are the registry values, so codes agree between runs, chunks and partitions
+# without re-factorizing strings or taking unions of categories. Values that
+# are not in the registry can be appended, flagged (encoded as missing) or
+# rejected.
+
+import json
+import os
+
+import pandas as pd
+
+DEFAULT_REGISTRY = os.path.join('Datasource', 'category_dictionaries.json')
+CATEGORICAL_COLUMNS = ['Neighbourhood', 'Room Type', 'Beds', 'Property Type']
+UNKNOWN_POLICIES = ('append', 'flag', 'raise')
+
+
+def load_registry(path=DEFAULT_REGISTRY):
+    """Load the category registry ({column: [values in code order]}); empty if missing"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['columns']
+
+
+def save_registry(registry, path=DEFAULT_REGISTRY):
+    """Write the registry atomically so a crashed run never leaves a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': 1, 'columns': registry}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _json_value(value):
+    """Plain Python value for JSON (numpy scalars -> int/float/str)"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def encode_column(series, registry, column=None, on_unknown='append'):
+    """Encode a column to a Categorical with stable registry codes
+
+    Returns (categorical Series, list of values not previously in the registry).
+    on_unknown: 'append' adds new values to the registry with the next codes,
+    'flag' encodes them as missing, 'raise' raises a ValueError.
+    """
+    if on_unknown not in UNKNOWN_POLICIES:
+        raise ValueError(f"on_unknown must be one of {UNKNOWN_POLICIES}")
+    column = column or series.name
+    values = registry.setdefault(column, []) if on_unknown == 'append' else list(registry.get(column, []))
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(series.cat.categories.dtype)
+    encoded = pd.Categorical(series, categories=pd.Index(values, dtype=series.dtype if values else None))
+    unknown_mask = series.notna().to_numpy() & (encoded.codes == -1)
+    unknown = [_json_value(v) for v in pd.unique(series[unknown_mask])]
+    try:
+        unknown.sort()  # deterministic codes for values first seen in the same batch
+    except TypeError:
+        pass
+
+    if unknown:
+        if on_unknown == 'raise':
+            raise ValueError(f"Unseen values in '{column}': {unknown[:10]}")
+        if on_unknown == 'append':
+            values.extend(unknown)
+            encoded = pd.Categorical(series, categories=pd.Index(values, dtype=series.dtype))
+
+    return pd.Series(encoded, index=series.index, name=series.name), unknown
+
+
+def encode_columns(df, registry, columns=None, on_unknown='append'):
+    """Encode several columns in place of their strings; returns (df, {column: new values})"""
+    columns = [col for col in (CATEGORICAL_COLUMNS if columns is None else columns) if col in df.columns]
+    df = df.copy()
+    unknown = {}
+    for column in columns:
+        df[column], new_values = encode_column(df[column], registry, column, on_unknown)
+        if new_values:
+            unknown[column] = new_values
+    return df, unknown
+
+
+def align_categories(df, registry, columns=None):
+    """Extend categorical columns to the full registry so frames encoded at different times concatenate cleanly
+
+    Registries are append-only, so this only adds categories; existing codes are untouched.
+    """
+    df = df.copy()
+    for column in (CATEGORICAL_COLUMNS if columns is None else columns):
+        if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype) and column in registry:
+            df[column] = df[column].cat.set_categories(registry[column])
+    return df
+
+
+def display_unknown_values(unknown, on_unknown):
+    """Report values that were not in the registry"""
+    if not unknown:
+        return
+    marker, action = {
+        'append': ("➕", 'added to the category registry'),
+        'flag': ("⚠️ ", 'not in the category registry (set to missing)'),
+    }[on_unknown]
+    for column, values in unknown.items():
+        preview = ', '.join(map(str, values[:5])) + (' ...' if len(values) > 5 else '')
+        print(f"  {marker} {len(values)} {column} value(s) {action}: {preview}")
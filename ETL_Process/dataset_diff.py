@@ -0,0 +1,252 @@
+# Keyed diff between two dataset snapshots (raw vs cleaned, or two cleaned runs)
+#
+# Both inputs are streamed in chunks. Every value is brought to a canonical
+# text form (plain numbers and ISO dates, so a raw Excel export and a cleaned
+# CSV compare equal where the ETL kept a value) and hashed per column.
+# Rows are hash-partitioned on their key: each partition holds only the key
+# text and one 64-bit hash per column, and is spilled to disk when the inputs
+# are larger than the memory budget. Partitions are then joined one at a time
+# on the key hash, so the diff never holds more than one partition of each
+# side in memory.
+
+import math
+import os
+import pickle
+import shutil
+import tempfile
+
+import pandas as pd
+import numpy as np
+
+from canonical import canonical_values
+
+DEFAULT_KEY = ['Host Id', 'Host Since']
+DATE_COLUMNS = ['Host Since']
+DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d']
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_MEMORY_BYTES = 256 * 1024**2
+SPILL_EXPANSION = 4  # in-memory partition size relative to the CSV bytes it came from
+
+STATUSES = ('added', 'removed', 'modified')
+
+
+def iter_dataset(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield chunks of a CSV (streamed) or an Excel workbook (read once, then split)"""
+    if path.endswith('.csv'):
+        yield from pd.read_csv(path, chunksize=chunksize)
+        return
+    df = pd.read_excel(path)
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def _hash_chunk(chunk, key, columns, date_columns):
+    """Key text, key hash, per-column value hashes and a whole-row hash for one chunk"""
+    canonical = {
+        col: canonical_values(chunk[col], DATE_FORMATS if col in date_columns else None)
+        for col in key + columns
+    }
+    keys = pd.DataFrame({col: canonical[col] for col in key})
+    hashes = pd.DataFrame({col: pd.util.hash_array(canonical[col]) for col in columns}, dtype=np.uint64)
+    hashes.insert(0, '_key', pd.util.hash_pandas_object(keys, index=False).to_numpy())
+    hashes.insert(1, '_row', pd.util.hash_pandas_object(hashes[columns], index=False).to_numpy()
+                  if columns else np.zeros(len(keys), dtype=np.uint64))
+    return keys, hashes
+
+
+class _Partitions:
+    """Hash partitions of one side, kept in memory or appended to pickle files on disk"""
+
+    def __init__(self, count, spill_dir=None, name=''):
+        self.count = count
+        self.spill_dir = spill_dir
+        self.name = name
+        self.parts = [[] for _ in range(count)]
+
+    def _path(self, index):
+        return os.path.join(self.spill_dir, f"{self.name}-{index:04d}.pkl")
+
+    def add(self, keys, hashes):
+        bucket = (hashes['_key'].to_numpy() % np.uint64(self.count)).astype(np.int64)
+        order = np.argsort(bucket, kind='stable')
+        bounds = np.searchsorted(bucket[order], np.arange(self.count + 1))
+        for index in range(self.count):
+            rows = order[bounds[index]:bounds[index + 1]]
+            if not len(rows):
+                continue
+            part = (keys.iloc[rows].reset_index(drop=True), hashes.iloc[rows].reset_index(drop=True))
+            if self.spill_dir is None:
+                self.parts[index].append(part)
+            else:
+                with open(self._path(index), 'ab') as f:
+                    pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, index, key, columns):
+        if self.spill_dir is None:
+            parts = self.parts[index]
+            self.parts[index] = []
+        else:
+            parts = []
+            if os.path.exists(self._path(index)):
+                with open(self._path(index), 'rb') as f:
+                    while True:
+                        try:
+                            parts.append(pickle.load(f))
+                        except EOFError:
+                            break
+        if not parts:
+            return (pd.DataFrame(columns=key),
+                    pd.DataFrame(columns=['_key', '_row'] + columns, dtype=np.uint64))
+        return (pd.concat([p[0] for p in parts], ignore_index=True),
+                pd.concat([p[1] for p in parts], ignore_index=True))
+
+
+def _partition_count(paths, memory_bytes):
+    size = sum(os.path.getsize(path) for path in paths)
+    return max(1, math.ceil(size * SPILL_EXPANSION / memory_bytes))
+
+
+def _read_columns(path):
+    """Column names of a dataset from its header row only (leading/trailing spaces stripped, as the ETL does)"""
+    reader = pd.read_csv if path.endswith('.csv') else pd.read_excel
+    return [str(col).strip() for col in reader(path, nrows=0).columns]
+
+
+def _split(path, partitions, key, columns, date_columns, chunksize):
+    """Hash-partition one side and return the number of rows read"""
+    rows = 0
+    for chunk in iter_dataset(path, chunksize):
+        chunk = chunk.rename(columns=lambda col: str(col).strip())
+        keys, hashes = _hash_chunk(chunk, key, columns, date_columns)
+        partitions.add(keys, hashes)
+        rows += len(chunk)
+    return rows
+
+
+def _diff_partition(left, right, key, columns, sample_size, report, details):
+    """Join one partition of each side on the key hash and update the report"""
+    left_keys, left_hashes = left
+    right_keys, right_hashes = right
+
+    # A key repeated on the left is matched by whichever of its rows the right side
+    # kept (the ETL drops duplicates after sorting out other rules), so the best
+    # matching left row is compared; repeated keys on the right use their first row.
+    left_first = ~left_hashes['_key'].duplicated().to_numpy()
+    right_first = ~right_hashes['_key'].duplicated().to_numpy()
+    report['duplicates_left'] += int((~left_first).sum())
+    report['duplicates_right'] += int((~right_first).sum())
+    right_keys, right_hashes = right_keys[right_first].reset_index(drop=True), right_hashes[right_first].reset_index(drop=True)
+    removed = left_first & ~left_hashes['_key'].isin(right_hashes['_key']).to_numpy()
+    added = ~right_hashes['_key'].isin(left_hashes['_key']).to_numpy()
+
+    # Inner join keeps the uint64 hashes exact (an outer join would turn them into floats)
+    pairs = left_hashes.assign(_left=np.arange(len(left_hashes))).merge(
+        right_hashes, on='_key', how='inner', suffixes=('_l', '_r'))
+    pairs['_same'] = pairs['_row_l'] == pairs['_row_r']
+    both = pairs.sort_values(['_key', '_same', '_left'], ascending=[True, False, True]).drop_duplicates('_key')
+    modified = ~both['_same'].to_numpy()
+    changed = {col: modified & (both[f'{col}_l'].to_numpy() != both[f'{col}_r'].to_numpy()) for col in columns}
+    for col, mask in changed.items():
+        report['column_changes'][col] += int(mask.sum())
+
+    report['removed'] += int(removed.sum())
+    report['added'] += int(added.sum())
+    report['modified'] += int(modified.sum())
+    report['unchanged'] += int((~modified).sum())
+
+    modified_rows = left_keys.iloc[both['_left'].to_numpy()[modified]].reset_index(drop=True)
+    flags = np.column_stack([changed[col][modified] for col in columns]) if columns else np.zeros((modified.sum(), 0), bool)
+    modified_rows['changed_columns'] = ['; '.join(col for col, flag in zip(columns, row) if flag) for row in flags]
+
+    for status, rows in (('removed', left_keys[removed]), ('added', right_keys[added]), ('modified', modified_rows)):
+        if not len(rows):
+            continue
+        rows = rows.reset_index(drop=True)
+        rows.insert(0, 'status', status)
+        needed = sample_size - len(report['samples'][status])
+        if needed > 0:
+            report['samples'][status].extend(rows.head(needed).to_dict('records'))
+        if details is not None:
+            details.append(rows)
+
+
+def diff_datasets(left_path, right_path, key=None, columns=None, date_columns=None,
+                  memory_bytes=DEFAULT_MEMORY_BYTES, partitions=None, chunksize=DEFAULT_CHUNKSIZE,
+                  sample_size=5, details_path=None):
+    """Compare two datasets on a key and return a report of added, removed and modified rows
+
+    left_path is the older snapshot (e.g. the raw workbook) and right_path the
+    newer one (e.g. airbnb_clean.csv). Values are compared on the columns both
+    sides share unless columns is given. The report counts rows per status,
+    changes per column and repeated keys per side; details_path (optional)
+    receives one CSV row per added, removed or modified key.
+    """
+    key = list(DEFAULT_KEY if key is None else key)
+    date_columns = list(DATE_COLUMNS if date_columns is None else date_columns)
+    left_columns, right_columns = _read_columns(left_path), _read_columns(right_path)
+    for side, available in (('left', left_columns), ('right', right_columns)):
+        missing = [col for col in key if col not in available]
+        if missing:
+            raise KeyError(f"Key columns missing from the {side} dataset: {missing}")
+    if columns is None:
+        columns = [col for col in left_columns if col in right_columns and col not in key]
+
+    count = partitions or _partition_count([left_path, right_path], memory_bytes)
+    spill_dir = tempfile.mkdtemp(prefix='dataset_diff_') if count > 1 else None
+    try:
+        sides = {side: _Partitions(count, spill_dir, side) for side in ('left', 'right')}
+        report = {
+            'left': left_path, 'right': right_path, 'key': key, 'partitions': count,
+            'rows_left': _split(left_path, sides['left'], key, columns, date_columns, chunksize),
+            'rows_right': _split(right_path, sides['right'], key, columns, date_columns, chunksize),
+            'added': 0, 'removed': 0, 'modified': 0, 'unchanged': 0,
+            'duplicates_left': 0, 'duplicates_right': 0,
+            'column_changes': {col: 0 for col in columns},
+            'columns_only_left': [col for col in left_columns if col not in right_columns],
+            'columns_only_right': [col for col in right_columns if col not in left_columns],
+            'samples': {status: [] for status in STATUSES},
+        }
+        details = [] if details_path else None
+        if details_path:
+            pd.DataFrame(columns=['status'] + key + ['changed_columns']).to_csv(details_path, index=False)
+        for index in range(count):
+            _diff_partition(sides['left'].load(index, key, columns), sides['right'].load(index, key, columns),
+                            key, columns, sample_size, report, details)
+            if details:
+                pd.concat(details).reindex(columns=['status'] + key + ['changed_columns']) \
+                    .to_csv(details_path, mode='a', header=False, index=False)
+                details.clear()
+    finally:
+        if spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+    return report
+
+
+def display_diff_report(report, show_samples=False):
+    """Display a dataset diff report in a formatted way"""
+    print(f"\n🔀 DATASET DIFF on {' + '.join(report['key'])}")
+    print("=" * 60)
+    print(f"  Left:  {report['left']} ({report['rows_left']:,} rows)")
+    print(f"  Right: {report['right']} ({report['rows_right']:,} rows)")
+    print(f"  ➕ Added: {report['added']:,}")
+    print(f"  ➖ Removed: {report['removed']:,}")
+    print(f"  ✏️  Modified: {report['modified']:,}")
+    print(f"  ✅ Unchanged: {report['unchanged']:,}")
+    for side in ('left', 'right'):
+        if report[f'duplicates_{side}']:
+            print(f"  ⚠️  Extra rows with a repeated key on the {side}: {report[f'duplicates_{side}']:,}")
+    for side in ('left', 'right'):
+        if report[f'columns_only_{side}']:
+            print(f"  • Columns only on the {side}: {', '.join(report[f'columns_only_{side}'])}")
+
+    changes = {col: count for col, count in report['column_changes'].items() if count}
+    if changes:
+        print("\n  Changes per column:")
+        for col, count in sorted(changes.items(), key=lambda item: -item[1]):
+            print(f"    {col}: {count:,}")
+
+    if show_samples:
+        for status in STATUSES:
+            if report['samples'][status]:
+                print(f"\n  Sample {status} rows:")
+                print(pd.DataFrame(report['samples'][status]).to_string(index=False))
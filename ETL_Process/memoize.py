@@ -0,0 +1,175 @@
+# Content-addressed memoization of report sections
+#
+# A section's outputs (return value, printed insight text and any files it
+# writes, such as rendered figures) are stored on disk under a key derived from
+# a fingerprint of its input data, its parameters and the code that produces
+# it. Re-running a report on unchanged data replays stored sections instead of
+# recomputing them; only sections whose inputs changed are run again. The
+# cache directory is bounded in size and evicts least recently used entries.
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'sections')
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+
+def fingerprint_frame(df):
+    """Content hash of a DataFrame (values, index, column names and dtypes)"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_file(path, block_size=1024**2):
+    """Content hash of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_code(*paths):
+    """Hash of the source files whose code produces the cached sections"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        digest.update(fingerprint_file(path).encode())
+    return digest.hexdigest()
+
+
+class _Tee:
+    """Write to the real stdout while keeping a copy of everything printed"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def getvalue(self):
+        return ''.join(self.parts)
+
+
+def _snapshot(directory):
+    """Map of file name -> (mtime, size) for change detection in an output directory"""
+    if not directory or not os.path.isdir(directory):
+        return {}
+    snapshot = {}
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            snapshot[name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+class SectionCache:
+    """Disk cache of section outputs keyed on data, parameters and code fingerprints"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, code_version=''):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.code_version = code_version
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, section, data_fingerprint, params=None):
+        payload = json.dumps([section, data_fingerprint, params or {}, self.code_version], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        os.utime(path)  # mark as recently used for eviction
+        return entry
+
+    def _store(self, key, entry):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def run(self, section, func, args=(), kwargs=None, data_fingerprint='', params=None, outputs_dir=None):
+        """Return func(*args, **kwargs), replaying its stored outputs when the key is cached
+
+        Printed text is replayed to stdout, and files the section wrote into
+        outputs_dir are restored there.
+        """
+        kwargs = kwargs or {}
+        key = self.key(section, data_fingerprint, params)
+        entry = self._load(key)
+        if entry is not None:
+            self.hits += 1
+            sys.stdout.write(entry['stdout'])
+            if outputs_dir and entry['files']:
+                os.makedirs(outputs_dir, exist_ok=True)
+                for name, content in entry['files'].items():
+                    with open(os.path.join(outputs_dir, name), 'wb') as f:
+                        f.write(content)
+            return entry['result']
+
+        self.misses += 1
+        before = _snapshot(outputs_dir)
+        tee = _Tee(sys.stdout)
+        previous, sys.stdout = sys.stdout, tee
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            sys.stdout = previous
+
+        files = {}
+        for name, signature in _snapshot(outputs_dir).items():
+            if before.get(name) != signature:
+                with open(os.path.join(outputs_dir, name), 'rb') as f:
+                    files[name] = f.read()
+
+        try:
+            self._store(key, {'section': section, 'result': result, 'stdout': tee.getvalue(), 'files': files})
+        except (pickle.PicklingError, TypeError, AttributeError):
+            pass  # results that cannot be pickled are simply not cached
+        return result
+
+    def summary(self):
+        return f"♻️  Section cache: {self.hits} reused, {self.misses} recomputed ({self.cache_dir})"
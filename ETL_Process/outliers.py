@@ -0,0 +1,225 @@
+# Group-wise robust outlier detection for Price and ratings
+#
+# Bounds are computed per Neighbourhood x Room Type instead of globally, so a
+# $400 night is normal in a Manhattan entire home but extreme for a Bronx
+# shared room. Two robust rules are available:
+#   - iqr: [Q1 - k * IQR, Q3 + k * IQR] (Tukey fences, k = 1.5)
+#   - mad: median +/- k * 1.4826 * MAD (modified z-score, k = 3.5); when the
+#     MAD is zero, 1.2533 * the mean absolute deviation is used instead
+# Groups with fewer than MIN_GROUP_SIZE values use the bounds of the whole
+# column. In memory, the statistics of every group and column come from one
+# groupby over the values in long format; for large inputs the same
+# statistics are computed from mergeable quantile sketches built chunk by
+# chunk. The bounds can then flag or winsorize rows and count outliers per group.
+
+import pandas as pd
+import numpy as np
+
+from sketches import QUANTILE_CAPACITY, QuantileSketch, weighted_quantiles
+
+DEFAULT_GROUP_COLS = ['Neighbourhood', 'Room Type']
+DEFAULT_VALUE_COLS = ['Price', 'Review Scores Rating']
+METHODS = {'iqr': 1.5, 'mad': 3.5}  # method -> default k
+ACTIONS = ('flag', 'winsorize')
+MIN_GROUP_SIZE = 10
+MAD_SCALE = 1.4826  # makes the MAD a consistent estimate of the standard deviation for normal data
+MEAN_AD_SCALE = 1.2533  # the same for the mean absolute deviation
+FLAG_SUFFIX = ' Outlier'
+
+
+def _long_values(df, group_cols, value_cols):
+    """Stack value_cols into (group columns..., column, value) rows, dropping missing values"""
+    data = df[group_cols + value_cols].copy()
+    for col in group_cols:
+        data[col] = data[col].astype(str)
+    for col in value_cols:
+        data[col] = pd.to_numeric(data[col], errors='coerce')
+    long = data.melt(id_vars=group_cols, value_vars=value_cols, var_name='column', value_name='value')
+    return long.dropna(subset=['value'])
+
+
+def _finish_bounds(stats, method, k):
+    """Add lower/upper bounds to a table of n, q1, median, q3, mad and mean_ad"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown outlier method '{method}' (expected one of {', '.join(METHODS)})")
+    k = METHODS[method] if k is None else k
+    if method == 'iqr':
+        iqr = stats['q3'] - stats['q1']
+        stats['lower'], stats['upper'] = stats['q1'] - k * iqr, stats['q3'] + k * iqr
+    else:
+        spread = np.where(stats['mad'] > 0, MAD_SCALE * stats['mad'], MEAN_AD_SCALE * stats['mean_ad'])
+        stats['lower'], stats['upper'] = stats['median'] - k * spread, stats['median'] + k * spread
+    return stats
+
+
+def _pool_small_groups(stats, overall, min_group_size):
+    """Give groups with too few values the bounds of their whole column"""
+    column_bounds = overall[['lower', 'upper']].reindex(stats.index.get_level_values('column'))
+    small = (stats['n'] < min_group_size).to_numpy()
+    stats['pooled'] = small
+    stats.loc[small, ['lower', 'upper']] = column_bounds.to_numpy()[small]
+    return stats
+
+
+def _empty_table(keys, columns):
+    """Table with no rows in the layout of the bounds or counts tables"""
+    index = pd.MultiIndex.from_arrays([[] for _ in keys], names=keys) if len(keys) > 1 else pd.Index([], name=keys[0])
+    return pd.DataFrame({col: pd.Series(dtype=float) for col in columns}, index=index)
+
+
+def _robust_stats(long, keys):
+    """n, quartiles, MAD and mean absolute deviation per key from one groupby"""
+    if long.empty:
+        return _empty_table(keys, ['n', 'q1', 'median', 'q3', 'mad', 'mean_ad'])
+    grouped = long.groupby(keys, sort=True)['value']
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    deviation = (long['value'] - grouped.transform('median')).abs().groupby([long[key] for key in keys], sort=True)
+    stats.insert(0, 'n', grouped.count())
+    stats['mad'] = deviation.median()
+    stats['mean_ad'] = deviation.mean()
+    return stats
+
+
+def compute_bounds(df, group_cols=None, value_cols=None, method='iqr', k=None, min_group_size=MIN_GROUP_SIZE):
+    """Exact robust bounds per group and value column for an in-memory DataFrame
+
+    Returns a table indexed by the group columns and 'column' with n, q1,
+    median, q3, mad, mean_ad, lower, upper and pooled (True where the group
+    was too small and got the column-wide bounds).
+    """
+    group_cols = list(DEFAULT_GROUP_COLS if group_cols is None else group_cols)
+    value_cols = list(DEFAULT_VALUE_COLS if value_cols is None else value_cols)
+    long = _long_values(df, group_cols, value_cols)
+    stats = _finish_bounds(_robust_stats(long, group_cols + ['column']), method, k)
+    overall = _finish_bounds(_robust_stats(long, ['column']), method, k)
+    return _pool_small_groups(stats, overall, min_group_size)
+
+
+class GroupedQuantileSketch:
+    """A quantile sketch per group and value column, for bounds over data streamed in chunks"""
+
+    def __init__(self, group_cols=None, value_cols=None, capacity=QUANTILE_CAPACITY):
+        self.group_cols = list(DEFAULT_GROUP_COLS if group_cols is None else group_cols)
+        self.value_cols = list(DEFAULT_VALUE_COLS if value_cols is None else value_cols)
+        self.capacity = capacity
+        self.sketches = {}  # (group values..., column) -> QuantileSketch
+
+    def update(self, chunk):
+        long = _long_values(chunk, self.group_cols, self.value_cols)
+        for key, values in long.groupby(self.group_cols + ['column'], sort=False)['value']:
+            self._sketch(key).update(values.to_numpy(dtype=float))
+
+    def merge(self, other):
+        for key, sketch in other.sketches.items():
+            self._sketch(key).merge(sketch)
+
+    def _sketch(self, key):
+        if key not in self.sketches:
+            self.sketches[key] = QuantileSketch(self.capacity)
+        return self.sketches[key]
+
+    @staticmethod
+    def _stats(sketch):
+        values, weights = sketch.weighted_items()
+        q1, median, q3 = weighted_quantiles(values, weights, [0.25, 0.5, 0.75])
+        deviation = np.abs(values - median)
+        order = np.argsort(deviation, kind='stable')
+        mad = weighted_quantiles(deviation[order], weights[order], [0.5])[0]
+        return {'n': int(weights.sum()), 'q1': q1, 'median': median, 'q3': q3, 'mad': mad,
+                'mean_ad': float((deviation * weights).sum() / weights.sum())}
+
+    def bounds(self, method='iqr', k=None, min_group_size=MIN_GROUP_SIZE):
+        """Approximate bounds in the same layout as compute_bounds"""
+        keys = sorted(self.sketches)
+        if not keys:
+            stats = _empty_table(self.group_cols + ['column'], ['n', 'q1', 'median', 'q3', 'mad', 'mean_ad'])
+            overall = _empty_table(['column'], list(stats.columns))
+            return _pool_small_groups(_finish_bounds(stats, method, k), _finish_bounds(overall, method, k), min_group_size)
+        stats = pd.DataFrame([self._stats(self.sketches[key]) for key in keys],
+                             index=pd.MultiIndex.from_tuples(keys, names=self.group_cols + ['column']))
+        columns = {}
+        for key, sketch in self.sketches.items():
+            columns.setdefault(key[-1], QuantileSketch(self.capacity)).merge(sketch)
+        overall = pd.DataFrame([self._stats(columns[column]) for column in sorted(columns)],
+                               index=pd.Index(sorted(columns), name='column'))
+        stats = _finish_bounds(stats, method, k)
+        return _pool_small_groups(stats, _finish_bounds(overall, method, k), min_group_size)
+
+
+def sketch_bounds(chunks, group_cols=None, value_cols=None, method='iqr', k=None, min_group_size=MIN_GROUP_SIZE):
+    """Approximate robust bounds from an iterable of DataFrame chunks"""
+    sketch = GroupedQuantileSketch(group_cols, value_cols)
+    for chunk in chunks:
+        sketch.update(chunk)
+    return sketch.bounds(method, k, min_group_size)
+
+
+def _row_bounds(df, bounds, column):
+    """Lower and upper bound of column for every row of df (NaN for groups without bounds)"""
+    group_cols = [name for name in bounds.index.names if name != 'column']
+    table = bounds.xs(column, level='column')[['lower', 'upper']].reset_index()
+    keys = pd.DataFrame({col: df[col].astype(str).to_numpy() for col in group_cols})
+    matched = keys.merge(table, on=group_cols, how='left')
+    return matched['lower'].to_numpy(), matched['upper'].to_numpy()
+
+
+def apply_bounds(df, bounds, action='flag'):
+    """Flag or winsorize the values outside their group's bounds
+
+    action 'flag' adds a boolean '<column> Outlier' column per value column;
+    'winsorize' clips values to the bounds (integer columns stay integers).
+    Returns (DataFrame, per-group outlier counts).
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown outlier action '{action}' (expected one of {', '.join(ACTIONS)})")
+    group_cols = [name for name in bounds.index.names if name != 'column']
+    df = df.copy()
+    counts = []
+    for column in bounds.index.get_level_values('column').unique():
+        lower, upper = _row_bounds(df, bounds, column)
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+        below, above = values < lower, values > upper
+        if action == 'flag':
+            df[f"{column}{FLAG_SUFFIX}"] = below | above
+        else:
+            if pd.api.types.is_integer_dtype(df[column]):
+                lower, upper = np.ceil(lower), np.floor(upper)
+            clipped = np.where(below, lower, np.where(above, upper, values))
+            df[column] = clipped.astype(df[column].dtype) if pd.api.types.is_integer_dtype(df[column]) else clipped
+        group_keys = [df[col].astype(str).to_numpy() for col in group_cols]
+        per_group = pd.DataFrame({'below': below, 'above': above}).groupby(group_keys).sum()
+        per_group.index = per_group.index.set_names(group_cols)
+        counts.append(per_group.assign(column=column).set_index('column', append=True))
+    counts = pd.concat(counts) if counts else _empty_table(group_cols + ['column'], ['below', 'above'])
+    counts['outliers'] = counts['below'] + counts['above']
+    return df, counts
+
+
+def count_outliers(chunks, bounds):
+    """Per-group outlier counts over an iterable of DataFrame chunks (an empty table when there are none)"""
+    counts = [apply_bounds(chunk, bounds)[1] for chunk in chunks]
+    if not counts:
+        counts = [_empty_table(list(bounds.index.names), ['below', 'above', 'outliers'])]
+    return pd.concat(counts).groupby(level=list(counts[0].index.names), sort=True).sum()
+
+
+def display_outlier_report(bounds, counts, method='iqr', top_n=5):
+    """Display outlier counts and bounds per value column in a formatted way"""
+    report = bounds.join(counts, how='left').fillna({'below': 0, 'above': 0, 'outliers': 0})
+    group_cols = [name for name in bounds.index.names if name != 'column']
+    print(f"\n🚨 OUTLIERS ({method.upper()} bounds by {' × '.join(group_cols)})")
+    print("=" * 60)
+    if report.empty:
+        print("  No values to check")
+        return
+    for column in report.index.get_level_values('column').unique():
+        rows = report.xs(column, level='column')
+        total, n = int(rows['outliers'].sum()), int(rows['n'].sum())
+        print(f"\n  {column}: {total:,} of {n:,} values outside their group's bounds "
+              f"({total / n * 100 if n else 0:.1f}%; {int(rows['below'].sum()):,} low, {int(rows['above'].sum()):,} high)")
+        for key, row in rows.sort_values('outliers', ascending=False).head(top_n).iterrows():
+            label = ' / '.join(str(value) for value in (key if isinstance(key, tuple) else (key,)))
+            pooled = ', column-wide bounds' if row['pooled'] else ''
+            print(f"    • {label}: {int(row['outliers']):,} of {int(row['n']):,} "
+                  f"({row['outliers'] / row['n'] * 100:.1f}%), bounds [{row['lower']:.1f}, {row['upper']:.1f}]{pooled}")
@@ -0,0 +1,300 @@
+# Hive-style partitioned storage for the cleaned Airbnb dataset
+#
+# write_partitioned() splits a DataFrame by one or more key columns into a
+# directory tree such as
+#     airbnb_clean/Neighbourhood=Brooklyn/Room Type=Private room/part-00000.csv
+# and records every file in _manifest.json together with its row count and the
+# min/max of each numeric column. A rewrite is staged next to the directory and
+# swapped in once complete. read_partitioned() evaluates filter
+# predicates against the partition values and those statistics first, so only
+# the files that can contain matching rows are ever opened.
+
+import json
+import os
+import re
+import shutil
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import numpy as np
+
+MANIFEST_NAME = '_manifest.json'
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+DEFAULT_PARTITION_COLS = ['Neighbourhood', 'Room Type']
+
+# Operators accepted in filter predicates: (column, op, value)
+OPERATORS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+    'in': lambda a, b: a in b,
+    'not in': lambda a, b: a not in b,
+}
+
+
+def _escape(value):
+    """Encode a partition value so it is safe as a directory name ('/' and '=' included)"""
+    if pd.isna(value):
+        return NULL_PARTITION
+    return quote(str(value), safe=' ')
+
+
+def _to_json_value(value):
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating,)):
+        return float(value)
+    return value
+
+
+def _base_dtype(series):
+    """dtype name of a column, looking through categoricals to their categories"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return str(series.cat.categories.dtype)
+    return str(series.dtype)
+
+
+def write_partitioned(df, root, partition_cols=None, max_rows_per_file=None):
+    """Write df as a Hive-style partitioned CSV dataset and return its manifest
+
+    The files are written to a staging directory next to root, which only
+    replaces the previous dataset once every file and the manifest are in
+    place, so a failed write leaves the old output untouched.
+    """
+    partition_cols = list(DEFAULT_PARTITION_COLS if partition_cols is None else partition_cols)
+    missing = [col for col in partition_cols if col not in df.columns]
+    if missing:
+        raise KeyError(f"Partition columns not found in dataset: {missing}")
+    root = os.path.normpath(root)
+    if os.path.isdir(root) and os.listdir(root) and not os.path.exists(os.path.join(root, MANIFEST_NAME)):
+        raise FileExistsError(f"'{root}' is not a partitioned dataset directory; refusing to replace it")
+
+    staging = f"{root}.staging"
+    if os.path.exists(staging):
+        shutil.rmtree(staging)  # left over from an interrupted write
+    try:
+        manifest = _write_files(df, staging, partition_cols, max_rows_per_file)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _swap_in(staging, root)
+    return manifest
+
+
+def _write_files(df, root, partition_cols, max_rows_per_file):
+    """Write the partition files and manifest of df under a new directory"""
+    os.makedirs(root)
+    data_cols = [col for col in df.columns if col not in partition_cols]
+    numeric_cols = [col for col in data_cols if pd.api.types.is_numeric_dtype(df[col]) and not isinstance(df[col].dtype, pd.CategoricalDtype)]
+    files = []
+
+    for key, group in df.groupby(partition_cols, sort=True, dropna=False, observed=True):
+        key = key if isinstance(key, tuple) else (key,)
+        directory = os.path.join(*[f"{col}={_escape(value)}" for col, value in zip(partition_cols, key)])
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+        step = max_rows_per_file or max(len(group), 1)
+        for part, start in enumerate(range(0, len(group), step)):
+            chunk = group.iloc[start:start + step]
+            rel_path = os.path.join(directory, f"part-{part:05d}.csv")
+            chunk[data_cols].to_csv(os.path.join(root, rel_path), index=False)
+
+            numeric = chunk[numeric_cols]
+            stats = {
+                col: {'min': _to_json_value(numeric[col].min()), 'max': _to_json_value(numeric[col].max())}
+                for col in numeric_cols if numeric[col].notna().any()
+            }
+            files.append({
+                'path': rel_path.replace(os.sep, '/'),
+                'partition': {col: (None if pd.isna(value) else str(value)) for col, value in zip(partition_cols, key)},
+                'rows': int(len(chunk)),
+                'stats': stats,
+            })
+
+    manifest = {
+        'partition_cols': partition_cols,
+        'columns': list(df.columns),
+        'dtypes': {col: _base_dtype(df[col]) for col in df.columns},
+        'total_rows': int(len(df)),
+        'files': files,
+    }
+    with open(os.path.join(root, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _swap_in(staging, root):
+    """Replace root with the fully written staging directory, then delete the old dataset"""
+    if not os.path.exists(root):
+        os.rename(staging, root)
+        return
+    previous = f"{root}.previous"
+    if os.path.exists(previous):
+        shutil.rmtree(previous)
+    os.rename(root, previous)
+    os.rename(staging, root)
+    shutil.rmtree(previous)
+
+
+def read_manifest(root):
+    """Load the partition manifest of a dataset directory"""
+    with open(os.path.join(root, MANIFEST_NAME)) as f:
+        return json.load(f)
+
+
+def _coerce(value, dtype):
+    """Convert a filter or partition value to the column's recorded type for comparisons"""
+    if isinstance(value, (list, tuple, set)):
+        return type(value)(_coerce(v, dtype) for v in value)
+    if value is None:
+        return None
+    if dtype and (dtype.startswith('int') or dtype.startswith('float')):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+    return str(value)
+
+
+def _partition_may_match(entry, column, op, value, dtype):
+    partition_value = entry['partition'][column]
+    if partition_value is None:
+        return op in ('!=', 'not in')
+    return OPERATORS[op](_coerce(partition_value, dtype), value)
+
+
+def _stats_may_match(entry, column, op, value):
+    """Decide from min/max statistics whether a file can hold rows matching the predicate"""
+    stats = entry['stats'].get(column)
+    if stats is None:
+        return True
+    low, high = stats['min'], stats['max']
+    try:
+        if op == '==':
+            return low <= value <= high
+        if op == 'in':
+            return any(low <= v <= high for v in value)
+        if op == '<':
+            return low < value
+        if op == '<=':
+            return low <= value
+        if op == '>':
+            return high > value
+        if op == '>=':
+            return high >= value
+        if op == '!=':
+            return not (low == high == value)
+    except TypeError:
+        return True
+    return True
+
+
+def prune_files(manifest, filters=None):
+    """Return the manifest entries that may contain rows matching every filter"""
+    filters = filters or []
+    dtypes = manifest.get('dtypes', {})
+    for column, op, _ in filters:
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator '{op}'")
+        if column not in manifest['columns']:
+            raise KeyError(f"Filter column '{column}' is not in the dataset")
+
+    selected = []
+    for entry in manifest['files']:
+        keep = True
+        for column, op, value in filters:
+            value = _coerce(value, dtypes.get(column))
+            if column in manifest['partition_cols']:
+                keep = _partition_may_match(entry, column, op, value, dtypes.get(column))
+            else:
+                keep = _stats_may_match(entry, column, op, value)
+            if not keep:
+                break
+        if keep:
+            selected.append(entry)
+    return selected
+
+
+def apply_filters(df, filters, dtypes=None):
+    """Apply (column, op, value) filters row by row (exact check after file-level pruning)"""
+    dtypes = dtypes if dtypes is not None else {col: _base_dtype(df[col]) for col in df.columns}
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        value = _coerce(value, dtypes.get(column))
+        series = df[column]
+        if op == 'in':
+            mask &= series.isin(value)
+        elif op == 'not in':
+            mask &= ~series.isin(value)
+        else:
+            mask &= OPERATORS[op](series, value).fillna(False)
+    return df[mask]
+
+
+def iter_partitioned(root, filters=None, columns=None):
+    """Yield the matching rows of a partitioned dataset one file at a time
+
+    Only files that can match the filters are opened; each yielded frame has
+    the manifest's column order with partition columns filled in.
+    """
+    filters = filters or []
+    manifest = read_manifest(root)
+    dtypes = manifest.get('dtypes', {})
+    partition_cols = manifest['partition_cols']
+    for entry in prune_files(manifest, filters):
+        frame = pd.read_csv(os.path.join(root, entry['path']))
+        for column in partition_cols:
+            frame[column] = _coerce(entry['partition'][column], dtypes.get(column))
+        frame = apply_filters(frame[manifest['columns']], filters, dtypes)
+        yield frame[columns] if columns else frame
+
+
+def read_partitioned(root, filters=None, columns=None):
+    """Read a partitioned dataset, opening only files that can match the filters
+
+    filters is a list of (column, op, value) predicates that must all hold, e.g.
+    [('Neighbourhood', '==', 'Brooklyn'), ('Price', '<', 200)].
+    """
+    frames = list(iter_partitioned(root, filters))
+    if frames:
+        df = pd.concat(frames, ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=read_manifest(root)['columns'])
+    return df[columns] if columns else df
+
+
+def _strip_quotes(value):
+    """Drop one pair of matching surrounding quotes, e.g. "'Staten Island'" -> 'Staten Island'"""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '\'"' and value[0] not in value[1:-1]:
+        return value[1:-1]
+    return value
+
+
+def parse_filter(text):
+    """Parse a command-line filter such as 'Neighbourhood==Brooklyn', 'Price<200' or 'Room Type==A|B'
+
+    Quotes around the value, or around each item of a '|' list, are stripped for every operator.
+    """
+    match = re.match(r'^\s*(.+?)\s*(==|!=|<=|>=|<|>)\s*(.*?)\s*$', text)
+    if not match:
+        raise ValueError(f"Cannot parse filter '{text}' (expected e.g. 'Neighbourhood==Brooklyn')")
+    column, op, value = match.groups()
+    column, value = _strip_quotes(column), _strip_quotes(value)
+    if op in ('==', '!=') and '|' in value:
+        return column, 'in' if op == '==' else 'not in', [unquote(_strip_quotes(v)) for v in value.split('|')]
+    return column, op, value
+
+
+def display_partition_summary(manifest, selected=None):
+    """Display partition counts and how many files/rows a filter would read"""
+    files = manifest['files']
+    print(f"\n🗂️  Partitioned dataset: {len(files)} files, {manifest['total_rows']:,} rows "
+          f"partitioned by {', '.join(manifest['partition_cols'])}")
+    if selected is not None:
+        rows = sum(entry['rows'] for entry in selected)
+        share = rows / manifest['total_rows'] * 100 if manifest['total_rows'] else 0
+        print(f"  • Pruned to {len(selected)} files, {rows:,} rows ({share:.1f}% of the data)")
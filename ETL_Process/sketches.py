@@ -0,0 +1,64 @@
+# Mergeable streaming sketches shared by the profiler and the outlier engine
+#
+# A QuantileSketch keeps a bounded number of items however many values it
+# sees: when a level overflows it is sorted and every other item is promoted
+# to the next level, where each item stands for twice as many values (KLL
+# style compaction). Sketches built on separate chunks can be merged.
+
+import numpy as np
+
+QUANTILE_CAPACITY = 1024  # items per compaction level
+
+
+def weighted_quantiles(values, weights, qs):
+    """Quantiles qs of sorted values where each value stands for weights[i] observations"""
+    if not len(values):
+        return [np.nan for _ in qs]
+    cumulative = np.cumsum(weights)
+    positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side='left')
+    return list(values[np.minimum(positions, len(values) - 1)])
+
+
+class QuantileSketch:
+    """Compacting-buffer quantile sketch: level i holds items that each stand for 2**i values"""
+
+    def __init__(self, capacity=QUANTILE_CAPACITY, seed=0):
+        self.capacity = capacity
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compact()
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.capacity:
+                items = np.sort(items)
+                keep_odd = len(items) % 2
+                promoted = items[keep_odd:][self.rng.integers(2)::2]
+                self.levels[level] = items[:keep_odd]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def weighted_items(self):
+        """Sorted retained items and the number of values each one stands for"""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantiles(self, qs):
+        values, weights = self.weighted_items()
+        return weighted_quantiles(values, weights, qs)
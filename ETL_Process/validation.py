@@ -0,0 +1,198 @@
+# Declarative schema and rule validation for the Airbnb ETL
+#
+# Each rule is a plain dictionary naming a check and the column(s) it applies
+# to. All rules are evaluated as vectorized boolean masks in one pass over a
+# batch (coerced columns are computed once and shared between rules), and the
+# result is a per-rule violation count plus a few sampled offending rows.
+# Reports can be accumulated over many batches, including duplicate-key rules
+# that must see keys from earlier batches.
+#
+# Counts are raw violations: every rule is checked independently on the input
+# as given. They are not the rows the ETL removes per step, since the ETL
+# applies its rules in sequence and imputes missing prices before dropping
+# incomplete rows (a row can violate several rules, or be repaired first).
+
+import pandas as pd
+import numpy as np
+
+# Columns every cleaned row must have, in output order (ETL.py drops rows missing any of them)
+REQUIRED_COLUMNS = ['Host Id', 'Host Since', 'Neighbourhood', 'Zipcode', 'Property Type', 'Room Type', 'Beds',
+                    'Price', 'Number of Records', 'Number Of Reviews', 'Review Scores Rating']
+
+# Rules enforced by ETL.py on the raw export, stated explicitly so their effect can be measured
+AIRBNB_RULES = [
+    {'name': 'duplicate_host_listing', 'check': 'unique', 'columns': ['Host Id', 'Host Since']},
+    {'name': 'host_since_not_date', 'check': 'date', 'column': 'Host Since', 'format': '%d/%m/%Y'},
+    {'name': 'price_not_numeric', 'check': 'numeric', 'column': 'Price'},
+    {'name': 'records_not_numeric', 'check': 'numeric', 'column': 'Number of Records'},
+    {'name': 'reviews_not_numeric', 'check': 'numeric', 'column': 'Number Of Reviews'},
+    {'name': 'rating_not_numeric', 'check': 'numeric', 'column': 'Review Scores Rating'},
+    {'name': 'rating_out_of_range', 'check': 'range', 'column': 'Review Scores Rating', 'min': 1, 'max': 100},
+    {'name': 'no_records', 'check': 'range', 'column': 'Number of Records', 'min': 1},
+    {'name': 'missing_required', 'check': 'not_null', 'columns': REQUIRED_COLUMNS},
+]
+
+# Rule sets by dataset name, used by the evaluation scanner
+SCHEMAS = {
+    'airbnb': AIRBNB_RULES,
+}
+
+
+class _BatchContext:
+    """Per-batch cache so every column is coerced at most once across all rules"""
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = {str(col).strip(): col for col in df.columns}
+        self._numeric = {}
+
+    def raw(self, column):
+        if column not in self.columns:
+            raise KeyError(f"Column '{column}' required by validation rules is missing")
+        return self.df[self.columns[column]]
+
+    def numeric(self, column):
+        if column not in self._numeric:
+            self._numeric[column] = pd.to_numeric(self.raw(column), errors='coerce').to_numpy(dtype=float)
+        return self._numeric[column]
+
+
+def _rule_columns(rule):
+    return rule['columns'] if 'columns' in rule else [rule['column']]
+
+
+def _check_not_null(ctx, rule, state):
+    mask = np.zeros(len(ctx.df), dtype=bool)
+    for column in _rule_columns(rule):
+        mask |= ctx.raw(column).isna().to_numpy()
+    return mask
+
+
+def _check_numeric(ctx, rule, state):
+    column = rule['column']
+    return ctx.raw(column).notna().to_numpy() & np.isnan(ctx.numeric(column))
+
+
+def _check_range(ctx, rule, state):
+    values = ctx.numeric(rule['column'])
+    mask = np.zeros(len(values), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        if rule.get('min') is not None:
+            mask |= values < rule['min']
+        if rule.get('max') is not None:
+            mask |= values > rule['max']
+    return mask
+
+
+def _check_date(ctx, rule, state):
+    raw = ctx.raw(rule['column'])
+    if pd.api.types.is_datetime64_any_dtype(raw):
+        return np.zeros(len(raw), dtype=bool)
+    # A value is valid if any accepted format parses it
+    unparsed = raw.notna().to_numpy().copy()
+    for date_format in rule.get('formats', [rule.get('format')]):
+        if not unparsed.any():
+            break
+        parsed = pd.to_datetime(raw[unparsed], format=date_format, errors='coerce')
+        unparsed[np.flatnonzero(unparsed)[parsed.notna().to_numpy()]] = False
+    return unparsed
+
+
+def _check_unique(ctx, rule, state):
+    # Hash the key columns so keys seen in earlier batches can be remembered cheaply
+    keys = pd.DataFrame({column: ctx.raw(column) for column in _rule_columns(rule)})
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    mask = pd.Series(hashes).duplicated().to_numpy()
+    seen = state.setdefault(rule['name'], np.array([], dtype=hashes.dtype))
+    if len(seen):
+        mask = mask | np.isin(hashes, seen)
+    state[rule['name']] = np.union1d(seen, hashes)
+    return mask
+
+
+CHECKS = {
+    'not_null': _check_not_null,
+    'numeric': _check_numeric,
+    'range': _check_range,
+    'date': _check_date,
+    'unique': _check_unique,
+}
+
+
+def evaluate_rules(df, rules=AIRBNB_RULES, state=None):
+    """Evaluate every rule on one batch and return a DataFrame of violation masks"""
+    ctx = _BatchContext(df)
+    state = {} if state is None else state
+    masks = {}
+    for rule in rules:
+        if rule['check'] not in CHECKS:
+            raise ValueError(f"Unknown validation check '{rule['check']}' in rule '{rule['name']}'")
+        masks[rule['name']] = CHECKS[rule['check']](ctx, rule, state)
+    return pd.DataFrame(masks, index=df.index)
+
+
+def new_report(rules=AIRBNB_RULES, sample_size=5):
+    """Create an empty validation report that batches can be added to"""
+    return {
+        'rules': rules,
+        'sample_size': sample_size,
+        'total_rows': 0,
+        'valid_rows': 0,
+        'violations': {rule['name']: 0 for rule in rules},
+        'samples': {rule['name']: [] for rule in rules},
+        'state': {},
+    }
+
+
+def update_report(report, df):
+    """Validate one batch into an existing report; returns the batch's valid-row mask"""
+    masks = evaluate_rules(df, report['rules'], report['state'])
+    counts = masks.sum()
+    report['total_rows'] += len(df)
+    for name, count in counts.items():
+        report['violations'][name] += int(count)
+        needed = report['sample_size'] - sum(len(sample) for sample in report['samples'][name])
+        if count and needed > 0:
+            report['samples'][name].append(df[masks[name].to_numpy()].head(needed))
+    valid = ~masks.any(axis=1)
+    report['valid_rows'] += int(valid.sum())
+    return valid
+
+
+def validate(data, rules=AIRBNB_RULES, sample_size=5):
+    """Validate a DataFrame or an iterable of DataFrame batches and return the report
+
+    The report holds total/valid row counts, the number of raw rows violating
+    each rule (each rule checked on its own) and up to sample_size offending
+    rows per rule.
+    """
+    report = new_report(rules, sample_size)
+    batches = [data] if isinstance(data, pd.DataFrame) else data
+    for batch in batches:
+        update_report(report, batch)
+    return finalize_report(report)
+
+
+def finalize_report(report):
+    """Turn accumulated samples into DataFrames and drop the cross-batch state"""
+    report = dict(report)
+    report.pop('state', None)
+    report['samples'] = {
+        name: pd.concat(parts) if parts else pd.DataFrame()
+        for name, parts in report['samples'].items()
+    }
+    return report
+
+
+def display_validation_report(report, show_samples=False):
+    """Display per-rule raw violation counts in a formatted way"""
+    total = report['total_rows']
+    print(f"\n🔎 VALIDATION REPORT: {total:,} rows checked, {report['valid_rows']:,} pass every rule")
+    print("  Raw violations, each rule checked on its own (not rows removed by the ETL, which imputes prices first)")
+    for name, count in report['violations'].items():
+        ratio = count / total * 100 if total > 0 else 0
+        marker = "⚠️ " if count else "✅"
+        print(f"  {marker} {name}: {count:,} rows ({ratio:.1f}%)")
+        sample = report['samples'].get(name)
+        if show_samples and sample is not None and not sample.empty:
+            print(sample.to_string(max_colwidth=30))
@@ -0,0 +1,274 @@
+"""Command-line entry point for the Airbnb data analysis pipeline
+
+Usage (from the repository root):
+    python pipeline.py evaluate [--data-dir Datasource] [--cache-dir .cache] [--memory-mb MB] [--triage-only]
+    python pipeline.py watch    [--data-dir Datasource] [--state .cache/watch_state.json] [--workers N] [--once]
+    python pipeline.py etl      [--input Datasource/airbnb.xlsx] [--output Datasource/airbnb_clean.csv]
+                                [--partition-dir DIR] [--partition-by "Neighbourhood,Room Type"] [--outliers flag|winsorize]
+    python pipeline.py eda      [--input Datasource/airbnb_clean.csv] [--figures-dir DIR] [--filter EXPR ...] [--cache-dir .cache]
+    python pipeline.py report   [--input Datasource/airbnb_clean.csv] [--filter EXPR ...] [--cache-dir .cache]
+                                [--sample-fraction F | --sample-budget SECONDS]
+    python pipeline.py cohorts  [--input Datasource/airbnb_clean.csv] [--batch NAME] [--granularity year|month]
+                                [--neighbourhood NAME] [--compare 2012 2015] [--no-update]
+    python pipeline.py outliers [--input Datasource/airbnb_clean.csv] [--method iqr|mad] [--chunksize N]
+    python pipeline.py validate [--input Datasource/airbnb.xlsx] [--samples N]
+    python pipeline.py diff     OLD NEW [--key "Host Id,Host Since"] [--details changes.csv] [--samples N]
+
+Stage modules are imported only when their subcommand runs, and matplotlib and
+seaborn only when a subcommand actually draws figures, so scheduled jobs that
+do not plot start quickly.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Stage directories (they hold plain scripts, not packages)
+EVALUATION_DIR = 'Dataset_Evaluatioin_Process'
+ETL_DIR = 'ETL_Process'
+EDA_DIR = 'EDA_Process & Result'
+
+# Default locations, relative to the working directory like the stage scripts
+DEFAULT_DATA_DIR = 'Datasource'
+DEFAULT_RAW = os.path.join('Datasource', 'airbnb.xlsx')
+DEFAULT_CLEAN = os.path.join('Datasource', 'airbnb_clean.csv')
+DEFAULT_CATEGORIES = os.path.join('Datasource', 'category_dictionaries.json')
+DEFAULT_CACHE_MB = 512
+DEFAULT_WRITE_WORKERS = 1
+
+
+def import_stage(stage_dir, module_name):
+    """Import a stage script as a module, making its directory importable first
+
+    The shared helpers in ETL_Process (storage, sketches, canonical values)
+    are made importable too, since every stage uses them.
+    """
+    for directory in (ETL_DIR, stage_dir):
+        path = os.path.join(ROOT, directory)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    return importlib.import_module(module_name)
+
+
+def run_evaluate(args):
+    evaluation = import_stage(EVALUATION_DIR, 'Dataset_Evaluation_Process')
+    return evaluation.main(args.data_dir, args.cache_dir, args.cache_max_mb * 1024**2,
+                           memory_budget=args.memory_mb * 1024**2, head_rows=args.head_rows, triage_only=args.triage_only,
+                           keep_frames=False)
+
+
+def run_watch(args):
+    watch = import_stage(EVALUATION_DIR, 'watch')
+    return watch.watch(args.data_dir, args.state, args.interval, args.settle, args.workers, once=args.once,
+                       verbose=not args.quiet)
+
+
+def split_columns(text):
+    """Parse a comma-separated column list such as 'Neighbourhood,Room Type'"""
+    return [col.strip() for col in text.split(',') if col.strip()] if text else None
+
+
+def parse_filters(expressions):
+    """Turn --filter expressions (e.g. 'Neighbourhood==Brooklyn') into predicates"""
+    if not expressions:
+        return None
+    partitions = import_stage(ETL_DIR, 'partitions')
+    return [partitions.parse_filter(text) for text in expressions]
+
+
+def run_etl(args):
+    etl = import_stage(ETL_DIR, 'ETL')
+    return etl.main(args.input, args.output, args.partition_dir, split_columns(args.partition_by), args.categories,
+                    args.write_workers, args.outliers, args.outlier_method)
+
+
+def sample_options(args):
+    options = {'sample_fraction': args.sample_fraction, 'sample_budget': args.sample_budget}
+    if args.sample_min is not None:
+        options['sample_min'] = args.sample_min
+    if args.sample_dir is not None:
+        options['sample_dir'] = args.sample_dir
+    return options
+
+
+def run_eda(args):
+    eda = import_stage(EDA_DIR, 'EDA')
+    return eda.main(args.input, plots=True, figures_dir=args.figures_dir, filters=parse_filters(args.filter),
+                    registry_path=args.categories, cache_dir=args.cache_dir, cache_max_bytes=args.cache_max_mb * 1024**2,
+                    **sample_options(args))
+
+
+def run_report(args):
+    eda = import_stage(EDA_DIR, 'EDA')
+    return eda.main(args.input, plots=False, filters=parse_filters(args.filter), registry_path=args.categories,
+                    cache_dir=args.cache_dir, cache_max_bytes=args.cache_max_mb * 1024**2, **sample_options(args))
+
+
+def run_cohorts(args):
+    cohorts = import_stage(EDA_DIR, 'cohorts')
+    return cohorts.main(args.input, args.store, args.batch, update=not args.no_update, granularity=args.granularity,
+                        by=(split_columns(args.by) or []) if args.by is not None else None, neighbourhood=args.neighbourhood,
+                        room_type=args.room_type, compare=args.compare)
+
+
+def run_outliers(args):
+    import pandas as pd
+    outliers = import_stage(ETL_DIR, 'outliers')
+    partitions = import_stage(ETL_DIR, 'partitions')
+    columns = split_columns(args.columns)
+    group_cols = split_columns(args.by)
+    if args.chunksize or os.path.isdir(args.input):
+        if os.path.isdir(args.input):
+            chunks = lambda: partitions.iter_partitioned(args.input)
+        else:
+            chunks = lambda: pd.read_csv(args.input, chunksize=args.chunksize)
+        bounds = outliers.sketch_bounds(chunks(), group_cols, columns, args.method, args.k)
+        counts = outliers.count_outliers(chunks(), bounds)
+    else:
+        df = pd.read_csv(args.input)
+        bounds = outliers.compute_bounds(df, group_cols, columns, args.method, args.k)
+        counts = outliers.count_outliers([df], bounds)
+    outliers.display_outlier_report(bounds, counts, args.method)
+    return 0
+
+
+def run_validate(args):
+    import pandas as pd
+    validation = import_stage(ETL_DIR, 'validation')
+    reader = pd.read_csv if args.input.endswith('.csv') else pd.read_excel
+    report = validation.validate(reader(args.input), sample_size=args.samples)
+    validation.display_validation_report(report, show_samples=args.samples > 0)
+    return 0 if report['valid_rows'] == report['total_rows'] else 2
+
+
+def run_diff(args):
+    dataset_diff = import_stage(ETL_DIR, 'dataset_diff')
+    report = dataset_diff.diff_datasets(args.old, args.new, key=split_columns(args.key), sample_size=args.samples,
+                                        memory_bytes=args.memory_mb * 1024**2, details_path=args.details)
+    dataset_diff.display_diff_report(report, show_samples=args.samples > 0)
+    differences = report['added'] + report['removed'] + report['modified']
+    return 0 if differences == 0 else 2
+
+
+def add_cache_arguments(parser):
+    parser.add_argument('--cache-dir', default=None, help='memoize section outputs in this directory (e.g. .cache)')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_CACHE_MB, help='cache size bound in MB (default: %(default)s)')
+
+
+def add_sample_arguments(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--sample-fraction', type=float, default=None,
+                       help='approximate mode: run on a stratified sample of this fraction of rows')
+    group.add_argument('--sample-budget', type=float, default=None,
+                       help='approximate mode: pick the sample fraction to finish in about this many seconds')
+    parser.add_argument('--sample-min', type=int, default=None, help='minimum rows per Neighbourhood x Room Type stratum (default: 30)')
+    parser.add_argument('--sample-dir', default=None, help='where samples are persisted and reused (default: .cache/samples)')
+
+
+def build_parser():
+    """Build the argument parser with one subcommand per pipeline stage"""
+    parser = argparse.ArgumentParser(prog='pipeline.py', description='Airbnb data analysis pipeline')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    evaluate = subparsers.add_parser('evaluate', help='Load and score every dataset in a directory')
+    evaluate.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='directory to scan (default: %(default)s)')
+    evaluate.add_argument('--memory-mb', type=int, default=1024, help='memory budget for fully loaded datasets (default: %(default)s)')
+    evaluate.add_argument('--head-rows', type=int, default=200, help='rows per CSV/sheet read during triage (default: %(default)s)')
+    evaluate.add_argument('--triage-only', action='store_true', help='only triage files from their metadata and first rows')
+    add_cache_arguments(evaluate)
+    evaluate.set_defaults(func=run_evaluate)
+
+    watch = subparsers.add_parser('watch', help='Re-evaluate (and re-clean) new or changed data files as they arrive')
+    watch.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='directory to watch (default: %(default)s)')
+    watch.add_argument('--state', default=os.path.join('.cache', 'watch_state.json'),
+                       help='file recording what was processed, so restarts skip unchanged inputs (default: %(default)s)')
+    watch.add_argument('--interval', type=float, default=2.0, help='seconds between polls (default: %(default)s)')
+    watch.add_argument('--settle', type=float, default=5.0, help='seconds a file must stay unchanged before it is read (default: %(default)s)')
+    watch.add_argument('--workers', type=int, default=2, help='files processed at the same time (default: %(default)s)')
+    watch.add_argument('--once', action='store_true', help='process pending changes and exit instead of watching')
+    watch.add_argument('--quiet', action='store_true', help='print one status line per file instead of full reports')
+    watch.set_defaults(func=run_watch)
+
+    etl = subparsers.add_parser('etl', help='Clean the raw Airbnb workbook')
+    etl.add_argument('--input', default=DEFAULT_RAW, help='raw Airbnb workbook (default: %(default)s)')
+    etl.add_argument('--output', default=DEFAULT_CLEAN, help='cleaned CSV to write; a .gz or .zst suffix compresses it (default: %(default)s)')
+    etl.add_argument('--partition-dir', default=None, help='also write Hive-style partitions with a manifest here')
+    etl.add_argument('--partition-by', default=None, help='comma-separated partition columns (default: Neighbourhood,Room Type)')
+    etl.add_argument('--categories', default=DEFAULT_CATEGORIES, help='category registry to extend with new values (default: %(default)s)')
+    etl.add_argument('--write-workers', type=int, default=DEFAULT_WRITE_WORKERS,
+                     help='processes formatting large CSV outputs in parallel; 1 writes with to_csv (default: %(default)s)')
+    etl.add_argument('--outliers', choices=['flag', 'winsorize'], default=None,
+                     help='flag or winsorize Price and rating outliers per Neighbourhood x Room Type')
+    etl.add_argument('--outlier-method', choices=['iqr', 'mad'], default='iqr', help='robust bounds used by --outliers (default: %(default)s)')
+    etl.set_defaults(func=run_etl)
+
+    eda = subparsers.add_parser('eda', help='Run the full EDA with figures')
+    eda.add_argument('--input', default=DEFAULT_CLEAN, help='cleaned CSV or partitioned directory (default: %(default)s)')
+    eda.add_argument('--figures-dir', default=None, help='save figures as PNG files here instead of showing them')
+    eda.add_argument('--filter', action='append', help="row filter such as 'Neighbourhood==Brooklyn' (repeatable); "
+                     "partitioned inputs read only matching files")
+    eda.add_argument('--categories', default=DEFAULT_CATEGORIES, help='category registry used to encode text columns (default: %(default)s)')
+    add_cache_arguments(eda)
+    add_sample_arguments(eda)
+    eda.set_defaults(func=run_eda)
+
+    report = subparsers.add_parser('report', help='Print the EDA business insights without plotting')
+    report.add_argument('--input', default=DEFAULT_CLEAN, help='cleaned CSV or partitioned directory (default: %(default)s)')
+    report.add_argument('--filter', action='append', help="row filter such as 'Neighbourhood==Brooklyn' (repeatable); "
+                        "partitioned inputs read only matching files")
+    report.add_argument('--categories', default=DEFAULT_CATEGORIES, help='category registry used to encode text columns (default: %(default)s)')
+    add_cache_arguments(report)
+    add_sample_arguments(report)
+    report.set_defaults(func=run_report)
+
+    cohorts = subparsers.add_parser('cohorts', help='Update and query host cohort aggregates built from Host Since')
+    cohorts.add_argument('--input', default=DEFAULT_CLEAN, help='cleaned CSV or partitioned directory to ingest (default: %(default)s)')
+    cohorts.add_argument('--store', default=os.path.join('.cache', 'host_cohorts.json'),
+                         help='cohort summary store, updated in place (default: %(default)s)')
+    cohorts.add_argument('--batch', default=None, help='name of the ingested batch, e.g. 2015-09; re-using a name replaces it, '
+                         'and batches must not share listings (default: the input file name)')
+    cohorts.add_argument('--no-update', action='store_true', help='only query the stored summary')
+    cohorts.add_argument('--granularity', choices=['month', 'year'], default='year', help='cohort bucket (default: %(default)s)')
+    cohorts.add_argument('--by', default=None, help="comma-separated columns kept apart (default: Neighbourhood; '' for none)")
+    cohorts.add_argument('--neighbourhood', default=None, help='only this neighbourhood')
+    cohorts.add_argument('--room-type', default=None, help='only this room type')
+    cohorts.add_argument('--compare', nargs=2, metavar=('COHORT', 'COHORT'), help='compare two cohorts, e.g. 2012 2015')
+    cohorts.set_defaults(func=run_cohorts)
+
+    outliers = subparsers.add_parser('outliers', help='Count Price and rating outliers per Neighbourhood x Room Type')
+    outliers.add_argument('--input', default=DEFAULT_CLEAN, help='cleaned CSV or partitioned directory (default: %(default)s)')
+    outliers.add_argument('--method', choices=['iqr', 'mad'], default='iqr', help='robust bounds (default: %(default)s)')
+    outliers.add_argument('--k', type=float, default=None, help='bound width (default: 1.5 for iqr, 3.5 for mad)')
+    outliers.add_argument('--columns', default=None, help='comma-separated value columns (default: Price,Review Scores Rating)')
+    outliers.add_argument('--by', default=None, help='comma-separated group columns (default: Neighbourhood,Room Type)')
+    outliers.add_argument('--chunksize', type=int, default=None,
+                          help='stream the CSV in chunks and use quantile sketches instead of loading it (partitioned input always streams)')
+    outliers.set_defaults(func=run_outliers)
+
+    validate = subparsers.add_parser('validate', help='Count raw rows violating each ETL rule')
+    validate.add_argument('--input', default=DEFAULT_RAW, help='raw CSV or Excel export to check (default: %(default)s)')
+    validate.add_argument('--samples', type=int, default=0, help='offending rows to show per rule (default: %(default)s)')
+    validate.set_defaults(func=run_validate)
+
+    diff = subparsers.add_parser('diff', help='Compare two dataset snapshots row by row on a key')
+    diff.add_argument('old', help='older snapshot, e.g. the raw workbook or last month\'s cleaned CSV')
+    diff.add_argument('new', help='newer snapshot, e.g. Datasource/airbnb_clean.csv')
+    diff.add_argument('--key', default=None, help='comma-separated key columns (default: Host Id,Host Since)')
+    diff.add_argument('--details', default=None, help='write every added, removed and modified key to this CSV')
+    diff.add_argument('--samples', type=int, default=5, help='example keys to show per change type (default: %(default)s)')
+    diff.add_argument('--memory-mb', type=int, default=256, help='memory budget before spilling partitions to disk (default: %(default)s)')
+    diff.set_defaults(func=run_diff)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
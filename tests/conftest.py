@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Stage folders are plain script directories; tests load them through the pipeline's import_stage
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
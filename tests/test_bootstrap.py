@@ -0,0 +1,26 @@
+import pandas as pd
+
+from pipeline import EDA_DIR, import_stage
+
+bootstrap = import_stage(EDA_DIR, 'bootstrap')
+
+
+def test_no_group_reaches_min_count_returns_all_columns():
+    df = pd.DataFrame({'Neighbourhood': ['Bronx', 'Bronx', 'Queens'], 'Price': [50.0, 70.0, 90.0]})
+    ci = bootstrap.bootstrap_group_ci(df, 'Neighbourhood', 'Price', min_count=5, seed=0)
+    assert ci.empty
+    assert list(ci.columns) == ['count', 'mean', 'mean_low', 'mean_high', 'median', 'median_low', 'median_high']
+
+
+def test_display_empty_ci(capsys):
+    ci = bootstrap.bootstrap_group_ci(pd.DataFrame({'Neighbourhood': [], 'Price': []}), 'Neighbourhood', 'Price',
+                                      min_count=5, seed=0)
+    bootstrap.display_group_ci(ci, 'Premium neighborhoods', min_count=5)
+    assert 'no groups with ≥ 5 listings' in capsys.readouterr().out
+
+
+def test_intervals_cover_point_estimates():
+    df = pd.DataFrame({'Neighbourhood': ['Bronx'] * 20 + ['Queens'] * 20, 'Price': list(range(20)) + list(range(100, 120))})
+    ci = bootstrap.bootstrap_group_ci(df, 'Neighbourhood', 'Price', n_resamples=200, seed=0)
+    assert (ci['mean_low'] <= ci['mean']).all() and (ci['mean'] <= ci['mean_high']).all()
+    assert ci.loc['Queens', 'median'] == 109.5
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from pipeline import ETL_DIR, import_stage
+
+partitions = import_stage(ETL_DIR, 'partitions')
+
+
+def test_parse_filter_strips_quotes_for_every_operator():
+    assert partitions.parse_filter('Neighbourhood=="Staten Island"') == ('Neighbourhood', '==', 'Staten Island')
+    assert partitions.parse_filter("Room Type!='Shared room'") == ('Room Type', '!=', 'Shared room')
+    assert partitions.parse_filter('Price<"200"') == ('Price', '<', '200')
+
+
+def test_parse_filter_strips_quotes_inside_in_lists():
+    expected = ('Neighbourhood', 'in', ['Staten Island', 'Queens'])
+    assert partitions.parse_filter('Neighbourhood=="Staten Island"|\'Queens\'') == expected
+    assert partitions.parse_filter('Neighbourhood=="Staten Island|Queens"') == expected
+    assert partitions.parse_filter('Neighbourhood!= "Bronx" | "Queens"') == ('Neighbourhood', 'not in', ['Bronx', 'Queens'])
+
+
+def test_quoted_in_filter_matches_rows():
+    df = pd.DataFrame({'Neighbourhood': ['Bronx', 'Queens', 'Staten Island'], 'Price': [50, 80, 120]})
+    rows = partitions.apply_filters(df, [partitions.parse_filter('Neighbourhood=="Staten Island"|"Queens"')])
+    assert list(rows['Neighbourhood']) == ['Queens', 'Staten Island']